@@ -3,7 +3,12 @@
 This module contains the implementation of a French Deck of cards.
 """
 
+import array
 import collections
+import functools
+import itertools
+import random
+import timeit
 
 # Named tuple to represent a card
 # If we create a simple tuple, we wouldn't be able to set the values
@@ -21,6 +26,7 @@ class FrenchDeck:
 
     ranks = [i for i in range(2, 11)] + list("JQKA")
     suits = ["spades", "diamonds", "clubs", "hearts"]
+    suit_values = dict(spades=3, hearts=2, diamonds=1, clubs=0)
 
     def __init__(self):
         """
@@ -34,7 +40,7 @@ class FrenchDeck:
         General Formula --
         `Card(rank, suit) = index(rank) * len(suits) + index(suit`)
         """
-        self._cards = [Card(rank, suit) for suit in self.suits for rank in self.ranks]
+        self._cards = [Card(rank, suit) for rank in self.ranks for suit in self.suits]
 
     def __len__(self):
         return len(self._cards)
@@ -51,8 +57,9 @@ class FrenchDeck:
         Returns:
             `list`: The list of cards with the specified rank.
         """
-        index = self.ranks.index(rank)
-        return self._cards[index::4]
+        # The cards of a rank are stored next to each other, one per suit
+        index = self.ranks.index(rank) * len(self.suits)
+        return self._cards[index : index + len(self.suits)]
 
     def filter_by_suit(self, suit):
         """Filter the cards by suit
@@ -63,8 +70,39 @@ class FrenchDeck:
         Returns:
             `list`: The list of cards with the specified suit.
         """
+        # Every `len(suits)`-th card belongs to the same suit
         index = self.suits.index(suit)
-        return self._cards[index::13]
+        return self._cards[index :: len(self.suits)]
+
+    @classmethod
+    @functools.cache
+    def _sort_ordinals(cls):
+        """Map every card to its position in the sorted order
+
+        The table is built once per class (`functools.cache` is keyed on `cls`)
+        so looking up the sort key of a card is a single dict access, instead of
+        a linear `ranks.index()` search.
+
+        Returns:
+            `dict`: The ordinal of each card.
+        """
+        n_suits = len(cls.suit_values)
+        return {
+            Card(rank, suit): rank_value * n_suits + cls.suit_values[suit]
+            for rank_value, rank in enumerate(cls.ranks)
+            for suit in cls.suits
+        }
+
+    @classmethod
+    @functools.cache
+    def _sorted_cards(cls):
+        """The distinct cards of the deck in the sorted order
+
+        Returns:
+            `tuple`: The cards ordered by their ordinals.
+        """
+        ordinals = cls._sort_ordinals()
+        return tuple(sorted(ordinals, key=ordinals.__getitem__))
 
     def sort_key(self, card):
         """Sort key for the cards
@@ -78,15 +116,179 @@ class FrenchDeck:
             `int`: The sort key for the card.
         """
 
-        suit_values = dict(spades=3, hearts=2, diamonds=1, clubs=0)
-        rank_value = self.ranks.index(card.rank)
-        return rank_value * len(suit_values) + suit_values[card.suit]
+        return self._sort_ordinals()[card]
+
+    def _counting_sort(self, counts):
+        """Emit each distinct card as many times as it was counted, in order
+
+        Args:
+            counts (`collections.Counter`): The number of copies of each card.
+
+        Returns:
+            `list`: The sorted list of cards.
+        """
+        return list(
+            itertools.chain.from_iterable(
+                itertools.repeat(card, counts[card]) for card in self._sorted_cards()
+            )
+        )
 
     def get_sorted(self):
         """Get the sorted list of cards
 
+        There are only `len(ranks) * len(suits)` distinct cards, so instead of
+        comparing the cards we count them (counting sort). This is linear in the
+        number of cards and makes no per-card calls to `sort_key`.
+
         Returns:
             `list`: The sorted list of cards.
         """
 
-        return sorted(self._cards, key=self.sort_key)
+        return self._counting_sort(collections.Counter(self._cards))
+
+
+class FrenchShoe(FrenchDeck):
+    """A shoe of several French decks stored as compact card codes
+
+    Instead of keeping a `Card` object for every card in every deck, each card
+    is stored as a single byte in an `array.array` (a flat sequence). The code
+    of a card follows the same formula as the deck --
+    `code = index(rank) * len(suits) + index(suit)`
+
+    A 52 entry table maps each code back to its `Card`, so cards are only
+    looked up when we access them with `__getitem__` or iterate over the shoe.
+    """
+
+    # `itertools.product` yields the ranks in the outer loop and the suits in
+    # the inner loop, so the position of a card in this table is its code.
+    _cards_by_code = tuple(
+        itertools.starmap(Card, itertools.product(FrenchDeck.ranks, FrenchDeck.suits))
+    )
+
+    def __init__(self, decks=6):
+        """Initialize the shoe with `decks` decks in the order of a new deck
+
+        Args:
+            decks (`int`): The number of decks in the shoe.
+        """
+        self.decks = decks
+        # Typecode `B` is an unsigned char, 1 byte per card
+        self._codes = array.array("B", range(len(self._cards_by_code))) * decks
+
+    def __len__(self):
+        return len(self._codes)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self._cards_by_code[code] for code in self._codes[position]]
+        return self._cards_by_code[self._codes[position]]
+
+    def __iter__(self):
+        return map(self._cards_by_code.__getitem__, self._codes)
+
+    def shuffle(self):
+        """Shuffle the cards of the shoe in place"""
+        random.shuffle(self._codes)
+
+    def filter_by_rank(self, rank):
+        """Filter the cards by rank
+
+        The shoe may be shuffled, so we can't slice it like a new deck. The
+        rank of a card is recovered from its code with integer division.
+
+        Args:
+            rank (`str`): The rank of the cards to be filtered.
+
+        Returns:
+            `list`: The list of cards with the specified rank.
+        """
+        index = self.ranks.index(rank)
+        n_suits = len(self.suits)
+        return [
+            self._cards_by_code[code]
+            for code in self._codes
+            if code // n_suits == index
+        ]
+
+    def filter_by_suit(self, suit):
+        """Filter the cards by suit
+
+        The suit of a card is recovered from its code with the modulo operator.
+
+        Args:
+            suit (`str`): The suit of the cards to be filtered.
+
+        Returns:
+            `list`: The list of cards with the specified suit.
+        """
+        index = self.suits.index(suit)
+        n_suits = len(self.suits)
+        return [
+            self._cards_by_code[code]
+            for code in self._codes
+            if code % n_suits == index
+        ]
+
+    def get_sorted(self):
+        """Get the sorted list of cards
+
+        The codes are counted straight from the array, and only the 52 distinct
+        codes are translated to cards before the counting sort.
+
+        Returns:
+            `list`: The sorted list of cards.
+        """
+        code_counts = collections.Counter(self._codes)
+        return self._counting_sort(
+            collections.Counter(
+                {self._cards_by_code[code]: n for code, n in code_counts.items()}
+            )
+        )
+
+
+def sorting_benchmark(decks=8, number=100):
+    """Sorting benchmark
+
+    Compare the counting sort of `get_sorted` with the previous implementation,
+    which called `sorted` with a key that rebuilt the suit values and searched
+    the ranks for every card.
+
+    Args:
+        decks (`int`): The number of decks in the shuffled shoe.
+        number (`int`): The number of times each sort is run.
+    """
+
+    def previous_sort_key(card):
+        suit_values = dict(spades=3, hearts=2, diamonds=1, clubs=0)
+        rank_value = FrenchDeck.ranks.index(card.rank)
+        return rank_value * len(suit_values) + suit_values[card.suit]
+
+    shoe = FrenchShoe(decks)
+    shoe.shuffle()
+    cards = list(shoe)
+
+    assert shoe.get_sorted() == sorted(cards, key=previous_sort_key)
+
+    print(f"Sorting a shuffled shoe of {len(shoe)} cards, {number} times")
+    print("sorted() with the previous key:")
+    print(timeit.timeit(lambda: sorted(cards, key=previous_sort_key), number=number))
+
+    print("\nsorted() with the precomputed key:")
+    print(timeit.timeit(lambda: sorted(cards, key=shoe.sort_key), number=number))
+
+    print("\nCounting sort:")
+    print(timeit.timeit(shoe.get_sorted, number=number))
+
+
+if __name__ == "__main__":
+    deck = FrenchDeck()
+    print(deck.filter_by_rank("A"))
+    print(deck.filter_by_suit("hearts")[:3])
+
+    shoe = FrenchShoe(decks=8)
+    shoe.shuffle()
+    print(len(shoe), shoe[0], shoe[-1])
+    print(len(shoe.filter_by_rank("A")))
+    # Output: 32
+
+    sorting_benchmark()
@@ -8,7 +8,13 @@ for operators like `+`, `*`, and other operations like `abs`, `bool`, `dot`,
 and `cross`.
 """
 
+import array
+import functools
+import itertools
 import math
+import operator
+import time
+import tracemalloc
 
 
 class Vector2:
@@ -68,3 +74,271 @@ class Vector2:
         """
 
         return self.x * other.y - self.y * other.x
+
+
+class FrozenVector2:
+    """An immutable and hashable 2D vector class.
+
+    `Vector2` keeps `x` and `y` in a per-instance `__dict__`. Declaring
+    `__slots__` stores the coordinates in fixed fields of the object instead,
+    which saves memory for every instance.
+
+    The coordinates are kept in the private `_x` and `_y` slots and exposed as
+    read-only properties, so `v.x = 1` raises `AttributeError`. Since the value
+    of the vector never changes, it can define `__hash__` and be used as a
+    dict key or a set member. The arithmetic methods read the slots directly
+    instead of going through the properties.
+    """
+
+    __slots__ = ("_x", "_y")
+
+    def __init__(self, x=0, y=0):
+        """Initialize the 2D vector.
+
+        Args:
+            `x` (`float`): The x-coordinate of the vector.
+            `y` (`float`): The y-coordinate of the vector.
+        """
+        self._x = x
+        self._y = y
+
+    @property
+    def x(self):
+        return self._x
+
+    @property
+    def y(self):
+        return self._y
+
+    def __repr__(self):
+        return f"FrozenVector2({self._x!r}, {self._y!r})"
+
+    def __str__(self):
+        return f"({self._x}, {self._y})"
+
+    def __eq__(self, other):
+        if not isinstance(other, FrozenVector2):
+            return NotImplemented
+        return self._x == other._x and self._y == other._y
+
+    def __hash__(self):
+        # Equal vectors must have equal hashes, so hash the same tuple
+        # that the equality compares.
+        return hash((self._x, self._y))
+
+    def __abs__(self):
+        return math.hypot(self._x, self._y)
+
+    def __bool__(self):
+        return bool(self._x or self._y)
+
+    def __add__(self, other):
+        return FrozenVector2(self._x + other._x, self._y + other._y)
+
+    def __mul__(self, scalar):
+        return FrozenVector2(self._x * scalar, self._y * scalar)
+
+    def dot(self, other):
+        """Dot product of two vectors.
+
+        Args:
+            `other` (`FrozenVector2`): The other vector.
+        """
+        return self._x * other._x + self._y * other._y
+
+    def cross(self, other):
+        """Cross product of two vectors.
+
+        Args:
+            `other` (`FrozenVector2`): The other vector.
+        """
+        return self._x * other._y - self._y * other._x
+
+
+class Vector2Array:
+    """A batch of 2D vectors stored in two flat `array.array` columns.
+
+    Every `Vector2` is a separate Python object with its own header and
+    `__dict__`, and each operation creates a new one. This class stores the
+    x and y coordinates of many vectors as contiguous `float64` values (type
+    code `d`), and its operations work on whole columns at once using `map`
+    with the functions of the `operator` and `math` modules, so no `Vector2`
+    objects are created along the way.
+    """
+
+    def __init__(self, xs=(), ys=()):
+        """Initialize the batch of vectors.
+
+        Args:
+            `xs` (`iterable`): The x-coordinates of the vectors.
+            `ys` (`iterable`): The y-coordinates of the vectors.
+
+        Raises:
+            `ValueError`: If the number of x and y coordinates differ.
+        """
+        self.xs = array.array("d", xs)
+        self.ys = array.array("d", ys)
+        if len(self.xs) != len(self.ys):
+            raise ValueError("xs and ys must have the same length")
+
+    @classmethod
+    def from_vectors(cls, vectors):
+        """Create a batch from a list of `Vector2`.
+
+        Args:
+            `vectors` (`list`): The vectors to be stored.
+        """
+        return cls(
+            map(operator.attrgetter("x"), vectors),
+            map(operator.attrgetter("y"), vectors),
+        )
+
+    def to_vectors(self):
+        """Convert the batch to a list of `Vector2`."""
+        return list(map(Vector2, self.xs, self.ys))
+
+    def __repr__(self):
+        return f"Vector2Array({list(self.xs)!r}, {list(self.ys)!r})"
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __iter__(self):
+        return map(Vector2, self.xs, self.ys)
+
+    def __getitem__(self, position):
+        if isinstance(position, int):
+            return Vector2(self.xs[position], self.ys[position])
+        if isinstance(position, slice):
+            return Vector2Array(self.xs[position], self.ys[position])
+        # Any other sequence is a boolean mask: keep the vectors where it is true
+        if len(position) != len(self):
+            raise ValueError("The mask must have the same length as the array")
+        return Vector2Array(
+            itertools.compress(self.xs, position),
+            itertools.compress(self.ys, position),
+        )
+
+    def _columns(self, other):
+        """Get the columns of the other operand.
+
+        A single `Vector2` is broadcast to the length of this array.
+        """
+        if isinstance(other, (Vector2, FrozenVector2)):
+            return itertools.repeat(other.x), itertools.repeat(other.y)
+        if len(other) != len(self):
+            raise ValueError("Both arrays must have the same length")
+        return other.xs, other.ys
+
+    def __add__(self, other):
+        other_xs, other_ys = self._columns(other)
+        return Vector2Array(
+            map(operator.add, self.xs, other_xs),
+            map(operator.add, self.ys, other_ys),
+        )
+
+    def __mul__(self, scalar):
+        return Vector2Array(
+            map(operator.mul, self.xs, itertools.repeat(scalar)),
+            map(operator.mul, self.ys, itertools.repeat(scalar)),
+        )
+
+    def __abs__(self):
+        return array.array("d", map(math.hypot, self.xs, self.ys))
+
+    def nonzero(self):
+        """Boolean mask of the vectors that are not the zero vector.
+
+        Returns:
+            `array.array`: `1` where the vector is truthy, `0` otherwise.
+        """
+        return array.array(
+            "B", map(operator.or_, map(bool, self.xs), map(bool, self.ys))
+        )
+
+    def dot(self, other):
+        """Dot products of the vectors with the other vectors.
+
+        Args:
+            `other` (`Vector2Array` | `Vector2` | `FrozenVector2`): The other vectors.
+
+        Returns:
+            `array.array`: The dot product of each pair of vectors.
+        """
+        other_xs, other_ys = self._columns(other)
+        return array.array(
+            "d",
+            map(
+                operator.add,
+                map(operator.mul, self.xs, other_xs),
+                map(operator.mul, self.ys, other_ys),
+            ),
+        )
+
+    def cross(self, other):
+        """Cross products of the vectors with the other vectors.
+
+        Args:
+            `other` (`Vector2Array` | `Vector2` | `FrozenVector2`): The other vectors.
+
+        Returns:
+            `array.array`: The cross product of each pair of vectors.
+        """
+        other_xs, other_ys = self._columns(other)
+        return array.array(
+            "d",
+            map(
+                operator.sub,
+                map(operator.mul, self.xs, other_ys),
+                map(operator.mul, self.ys, other_xs),
+            ),
+        )
+
+
+def vector_benchmark(count=10_000_000):
+    """Memory and throughput benchmark of `Vector2` and `FrozenVector2`
+
+    For each class, we measure the memory traced by `tracemalloc` while `count`
+    instances are alive, and the time taken to add them all together. All the
+    vectors share the same small integer coordinates, so only the cost of the
+    vector objects themselves is measured.
+
+    Args:
+        `count` (`int`): The number of instances of each class.
+    """
+
+    for cls in (Vector2, FrozenVector2):
+        tracemalloc.start()
+        vectors = [cls(1, 2) for _ in range(count)]
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        functools.reduce(operator.add, vectors)
+        elapsed = time.perf_counter() - start
+        del vectors
+
+        print(f"{cls.__name__}:")
+        print(f"  {memory / count:.1f} bytes per instance ({memory / 2**20:.1f} MiB)")
+        print(f"  {count / elapsed:,.0f} additions per second")
+
+
+if __name__ == "__main__":
+    positions = Vector2Array.from_vectors(
+        [Vector2(3, 4), Vector2(0, 0), Vector2(1, 2)]
+    )
+    velocities = Vector2Array([1, 0, 1], [0, 0, -1])
+
+    positions = positions + velocities * 0.5
+    print(positions)
+    # Output: Vector2Array([3.5, 0.0, 1.5], [4.0, 0.0, 1.5])
+
+    print(abs(positions))
+    print(positions.dot(Vector2(1, 0)))
+    print(positions[positions.nonzero()].to_vectors())
+
+    # Frozen vectors can be used as keys of a spatial hash
+    buckets = {FrozenVector2(0, 0): ["origin"]}
+    print(buckets[FrozenVector2(0, 0)])
+
+    # vector_benchmark()
@@ -5,6 +5,10 @@ This module contains the application of special methods for the `SerialNumber` a
 Especially, the `__format__` method is used to format the serial number as a three-digit number.
 """
 
+import itertools
+import operator
+import sys
+
 
 class SerialNumber:
     """A class to represent a serial number."""
@@ -32,6 +36,55 @@ class SerialNumber:
     def __repr__(self):
         return f"SerialNumber({self._value})"
 
+    def __eq__(self, other):
+        if not isinstance(other, SerialNumber):
+            return NotImplemented
+        return self._value == other._value
+
+    def __hash__(self):
+        return hash(self._value)
+
+
+def _write_values(values, file, format_spec, chunk_size):
+    """Write the formatted values to a file, one per line.
+
+    Formatting and writing each value on its own makes a call per value. The
+    values are instead taken `chunk_size` at a time, and a template with one
+    `{:format_spec}` field per value is formatted with the whole chunk in a
+    single `str.format` call and written with a single `write` call. The
+    template is built once and reused for every full chunk, so the memory used
+    depends on `chunk_size` and not on the number of values.
+
+    Args:
+        `values` (`iterable`): The integer values to be written.
+        `file` (`io.TextIOBase`): The file to write to.
+        `format_spec` (`str`): The format specification of each value.
+        `chunk_size` (`int`): The number of values formatted at once.
+
+    Returns:
+        `int`: The number of values written.
+
+    Raises:
+        `ValueError`: If the chunk size is not positive.
+    """
+    if chunk_size <= 0:
+        raise ValueError("Chunk size must be positive")
+    # Braces can't be escaped inside a format specification, so a spec with a
+    # brace fill character is passed as a nested `{format_spec}` field.
+    nested_spec = {}
+    if "{" in format_spec or "}" in format_spec:
+        nested_spec["format_spec"] = format_spec
+        format_spec = "{format_spec}"
+    line = f"{{:{format_spec}}}\n"
+    chunk_template = line * chunk_size
+    values = iter(values)
+    written = 0
+    while chunk := tuple(itertools.islice(values, chunk_size)):
+        template = chunk_template if len(chunk) == chunk_size else line * len(chunk)
+        file.write(template.format(*chunk, **nested_spec))
+        written += len(chunk)
+    return written
+
 
 class Series:
     """A class to represent a series of serial numbers."""
@@ -66,14 +119,112 @@ class Series:
         return str(list(map(str, self._numbers)))
 
     def __repr__(self):
-        return f"Series({self._count:!r})"
+        return f"Series({self._count!r})"
 
     def __bool__(self):
         return bool(self._numbers)
 
+    def write_to(self, file, format_spec="03", chunk_size=8192):
+        """Write the serial numbers to a file, one per line.
+
+        Args:
+            `file` (`io.TextIOBase`): The file to write to.
+            `format_spec` (`str`): The format specification of each serial number.
+            `chunk_size` (`int`): The number of serial numbers written at once.
+
+        Returns:
+            `int`: The number of serial numbers written.
+
+        Raises:
+            `ValueError`: If the chunk size is not positive.
+        """
+        values = map(operator.attrgetter("_value"), self._numbers)
+        return _write_values(values, file, format_spec, chunk_size)
+
+
+class LazySeries:
+    """A series of serial numbers computed on demand from a `range`.
+
+    `Series` creates all of its `SerialNumber` objects up front. A `range` only
+    stores its start, stop and step, so this class creates a `SerialNumber`
+    when an item is accessed, and its memory doesn't depend on its length.
+    """
+
+    def __init__(self, count):
+        """Initialize the series of serial numbers.
+
+        Args:
+            `count` (`int` | `range`): The number of serial numbers in the
+            series, starting from 1, or the range of their values.
+        """
+        self._range = count if isinstance(count, range) else range(1, count + 1)
+
+    def __getitem__(self, index):
+        # Slicing a range returns another range, so a slice of the series is
+        # also lazy instead of a list.
+        if isinstance(index, slice):
+            return LazySeries(self._range[index])
+        return SerialNumber(self._range[index])
+
+    def __len__(self):
+        return len(self._range)
+
+    def __iter__(self):
+        return map(SerialNumber, self._range)
+
+    def __reversed__(self):
+        return map(SerialNumber, reversed(self._range))
+
+    def __contains__(self, value):
+        # `range.__contains__` computes the answer for integers without
+        # iterating over the range.
+        if not isinstance(value, SerialNumber):
+            return False
+        return value._value in self._range
+
+    def __str__(self):
+        return str(list(map(str, self)))
+
+    def __repr__(self):
+        if self._range.start == 1 and self._range.step == 1:
+            return f"LazySeries({len(self._range)!r})"
+        return f"LazySeries({self._range!r})"
+
+    def __bool__(self):
+        return bool(self._range)
+
+    def write_to(self, file, format_spec="03", chunk_size=8192):
+        """Write the serial numbers to a file, one per line.
+
+        The values come straight from the range, without creating any
+        `SerialNumber` objects.
+
+        Args:
+            `file` (`io.TextIOBase`): The file to write to.
+            `format_spec` (`str`): The format specification of each serial number.
+            `chunk_size` (`int`): The number of serial numbers written at once.
+
+        Returns:
+            `int`: The number of serial numbers written.
+
+        Raises:
+            `ValueError`: If the chunk size is not positive.
+        """
+        return _write_values(self._range, file, format_spec, chunk_size)
+
 
 if __name__ == "__main__":
     series = Series(5)
 
     print(series)
     # Output: ['001', '002', '003', '004', '005']
+
+    serials = LazySeries(10**9)
+    print(SerialNumber(123_456_789) in serials)
+    # Output: True
+
+    print(repr(serials[::100_000_000]), serials[::100_000_000])
+    # Output: LazySeries(range(1, 1000000001, 100000000)) ['001', '100000001', ...]
+
+    serials[:12].write_to(sys.stdout, format_spec="06", chunk_size=5)
+    # Output: 000001 to 000012, one per line
@@ -24,7 +24,25 @@ is higher than expected because the function itself holds a reference to the obj
 """
 
 import array
+import collections
+import gc
+import importlib.util
+import os
 import sys
+import tracemalloc
+import types
+
+# The root of the repository, which contains the chapter directories
+BOOK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Objects that a data structure refers to, but doesn't own
+SHARED_TYPES = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+)
 
 
 def sequence_type_example():
@@ -64,5 +82,188 @@ def sequence_type_example():
     # `print_addresses` is not included in the count.
 
 
+def deep_size_breakdown(obj):
+    """Get the memory used by an object and all the objects it refers to
+
+    `sys.getsizeof` only counts the object itself: the size of a list of tuples
+    is the size of its array of references, without the tuples nor their items.
+    Here the object graph is walked with `gc.get_referents`, and the id of each
+    object is remembered so that an object referred to several times, like an
+    interned string or a small integer, is only counted once. Classes, modules
+    and functions are shared by the whole program, so they aren't counted.
+
+    The `__dict__` of an instance is counted when it's a referent of the
+    instance. Since Python 3.11 the attributes of an instance are stored inline
+    until its `__dict__` is accessed, and `sys.getsizeof` doesn't include that
+    storage, so the size of such instances is a lower bound. The dict isn't
+    accessed here, since that would create it and use more memory.
+
+    Args:
+        obj (`object`): The object to measure.
+
+    Returns:
+        `dict`: The `[count, size]` of the objects of each type, in bytes, from
+        the largest to the smallest size.
+    """
+
+    breakdown = collections.defaultdict(lambda: [0, 0])
+    seen = {id(obj)}
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        entry = breakdown[type(obj).__name__]
+        entry[0] += 1
+        entry[1] += sys.getsizeof(obj)
+
+        for referent in gc.get_referents(obj):
+            if id(referent) not in seen and not isinstance(referent, SHARED_TYPES):
+                seen.add(id(referent))
+                stack.append(referent)
+
+    return dict(sorted(breakdown.items(), key=lambda item: item[1][1], reverse=True))
+
+
+def deep_getsizeof(obj):
+    """Get the memory used by an object and all the objects it refers to
+
+    Args:
+        obj (`object`): The object to measure.
+
+    Returns:
+        `int`: The size in bytes, see `deep_size_breakdown`.
+    """
+
+    return sum(size for _, size in deep_size_breakdown(obj).values())
+
+
+def print_size_breakdown(label, obj):
+    """Print the shallow and deep size of an object, and its size per type"""
+
+    breakdown = deep_size_breakdown(obj)
+    total = sum(size for _, size in breakdown.values())
+    print(f"{label}: {sys.getsizeof(obj):,} bytes shallow, {total:,} bytes deep")
+    for name, (count, size) in breakdown.items():
+        print(f"  {name:16} {count:8,} objects {size:12,} bytes")
+
+
+class AllocationTracer:
+    """A context manager that traces the memory allocated by a block of code
+
+    `tracemalloc` records the memory allocated by Python. On entering the block
+    the peak is reset, so on exiting `peak` is the most memory that was
+    allocated at once by the block, and `retained` is the memory that it
+    allocated and didn't free, e.g. the data structure that it built.
+
+    Tracing is started if it isn't yet, and then stopped on exit. Nested tracers
+    reset the peak of the outer one.
+
+    Example:
+        with AllocationTracer("squares") as tracer:
+            squares = [i * i for i in range(1000)]
+        print(tracer.peak)
+    """
+
+    def __init__(self, label=None):
+        """Initialize the tracer
+
+        Args:
+            `label` (`str`): The name of the block printed on exit, nothing is
+            printed if `None`.
+        """
+        self.label = label
+        self.retained = 0
+        self.peak = 0
+        self._start = 0
+        self._started = False
+
+    def __enter__(self):
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._start, _ = tracemalloc.get_traced_memory()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        current, peak = tracemalloc.get_traced_memory()
+        if self._started:
+            tracemalloc.stop()
+        self.retained = current - self._start
+        self.peak = peak - self._start
+        if self.label:
+            print(
+                f"{self.label}: peak {self.peak:,} bytes, "
+                f"retained {self.retained:,} bytes"
+            )
+
+
+def load_chapter_module(path):
+    """Load a module of a chapter
+
+    The modules are named after their section, like `01_card_deck.py`, so they
+    can't be imported with an `import` statement.
+
+    Args:
+        path (`str`): The path of the module, relative to the root of the book.
+
+    Returns:
+        `module`: The loaded module.
+    """
+
+    name = os.path.splitext(path)[0].replace(os.sep, ".").replace("/", ".")
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.spec_from_file_location(name, os.path.join(BOOK_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    # Registered before running it, like an imported module
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def memory_accounting_example():
+    """Memory accounting example
+
+    Compares the shallow and deep size of the data structures of the first
+    chapters, and the memory allocated while building them.
+    """
+
+    card_deck = load_chapter_module("Chapter_01/01_card_deck.py")
+    special_methods = load_chapter_module("Chapter_01/04_special_methods.py")
+    reports = load_chapter_module("Chapter_02/08_unpacking_sequences.py")
+
+    with AllocationTracer("get_student_data()"):
+        records = reports.get_student_data()
+    print_size_breakdown("Student records (tuples)", records)
+
+    # The same records as namedtuples and dicts: a namedtuple is as small as a
+    # tuple, while each dict also stores its keys and a hash table.
+    Record = collections.namedtuple("Record", "id name maths english physics chem art")
+    print_size_breakdown("Student records (namedtuples)", [Record(*r) for r in records])
+    print_size_breakdown(
+        "Student records (dicts)", [Record(*r)._asdict() for r in records]
+    )
+
+    # The cards share the rank and suit objects of the class attributes
+    with AllocationTracer("FrenchDeck()"):
+        deck = card_deck.FrenchDeck()
+    print_size_breakdown("FrenchDeck", deck)
+
+    with AllocationTracer("Series(10_000)"):
+        series = special_methods.Series(10_000)
+    print_size_breakdown("Series", series)
+
+    with AllocationTracer("LazySeries(10_000)"):
+        lazy_series = special_methods.LazySeries(10_000)
+    print_size_breakdown("LazySeries", lazy_series)
+
+    # A flat sequence stores its values instead of references to int objects
+    numbers = list(range(10_000))
+    print_size_breakdown("list of 10,000 ints", numbers)
+    print_size_breakdown("array of 10,000 ints", array.array("i", numbers))
+
+
 if __name__ == "__main__":
     sequence_type_example()
+    # memory_accounting_example()
@@ -3,6 +3,7 @@
 This module demonstrates the use of list comprehension to create a cartesian product.
 """
 
+import collections.abc
 from collections import namedtuple
 from pprint import pprint
 
@@ -25,5 +26,165 @@ def tshirt_example():
     pprint(tshirts)
 
 
+class ProductCatalog(collections.abc.Sequence):
+    """A lazy cartesian product of the options of each dimension
+
+    The items are not created up front. Like the index formula of `FrenchDeck`,
+    the index of an item is a number in a mixed radix system, where each digit
+    is the index of an option, and the base of the digit is the number of options
+    of its dimension. The last dimension varies the fastest, like the nested
+    `for` loops of a list comprehension. An item at any index, or the index of
+    any item, is computed with a few divisions and multiplications.
+
+    `collections.abc.Sequence` provides `__contains__`, `__iter__`,
+    `__reversed__`, `index` and `count` on top of `__len__` and `__getitem__`.
+    """
+
+    def __init__(self, item_type, **dimensions):
+        """Initialize the catalog
+
+        Args:
+            item_type (`type`): The namedtuple type of the items.
+            dimensions (`list`): The options of each field of the items.
+
+        Raises:
+            `ValueError`: If the dimensions don't match the fields of the items.
+        """
+        if tuple(dimensions) != item_type._fields:
+            raise ValueError(f"The dimensions must be {item_type._fields}")
+
+        self.item_type = item_type
+        self._options = tuple(tuple(options) for options in dimensions.values())
+        # The position of each option in its dimension, for the reverse lookup
+        self._positions = tuple(
+            {option: position for position, option in enumerate(options)}
+            for options in self._options
+        )
+        # The place value of each digit: the number of items between two
+        # consecutive options of the dimension
+        self._place_values = []
+        place_value = 1
+        for options in reversed(self._options):
+            self._place_values.append(place_value)
+            place_value *= len(options)
+        self._place_values.reverse()
+        self._length = place_value
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return CatalogSlice(self, range(self._length)[index])
+
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("ProductCatalog index out of range")
+
+        fields = []
+        for options, place_value in zip(self._options, self._place_values):
+            position, index = divmod(index, place_value)
+            fields.append(options[position])
+        return self.item_type._make(fields)
+
+    def index(self, item, start=0, stop=None):
+        """Get the index of an item
+
+        Overrides the linear search of `Sequence.index` with the index formula.
+
+        Raises:
+            `ValueError`: If the item isn't in the catalog.
+        """
+        try:
+            index = sum(
+                positions[field] * place_value
+                for positions, field, place_value in zip(
+                    self._positions, item, self._place_values
+                )
+            )
+        except (KeyError, TypeError):
+            raise ValueError(f"{item!r} is not in the catalog") from None
+        # Negative bounds count from the end, like in `Sequence.index`
+        if start is not None and start < 0:
+            start = max(self._length + start, 0)
+        if stop is not None and stop < 0:
+            stop += self._length
+        start = 0 if start is None else start
+        stop = self._length if stop is None else stop
+        if not (len(item) == len(self._options) and start <= index < stop):
+            raise ValueError(f"{item!r} is not in the catalog")
+        return index
+
+    def __contains__(self, item):
+        try:
+            self.index(item)
+        except ValueError:
+            return False
+        return True
+
+    def count(self, item):
+        return int(item in self)
+
+    def __repr__(self):
+        dimensions = ", ".join(
+            f"{name}={list(options)!r}"
+            for name, options in zip(self.item_type._fields, self._options)
+        )
+        return f"ProductCatalog({self.item_type.__name__}, {dimensions})"
+
+
+class CatalogSlice(collections.abc.Sequence):
+    """A lazy slice of a `ProductCatalog`
+
+    Slicing a `range` returns another `range`, so the slice only keeps the range
+    of its indices in the catalog, and creates the items when they are accessed.
+    """
+
+    def __init__(self, catalog, indices):
+        self._catalog = catalog
+        self._indices = indices
+
+    def __len__(self):
+        return len(self._indices)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return CatalogSlice(self._catalog, self._indices[index])
+        return self._catalog[self._indices[index]]
+
+    def __repr__(self):
+        return f"CatalogSlice({self._catalog!r}, {self._indices!r})"
+
+
+def product_catalog_example():
+    """Product Catalog Example
+
+    A catalog of T-Shirts with more dimensions, computed lazily.
+    """
+
+    TShirt = namedtuple("TShirt", ["color", "size", "fit", "material", "print"])
+
+    catalog = ProductCatalog(
+        TShirt,
+        color=["red", "green", "blue", "black", "white"],
+        size=["XS", "S", "M", "L", "XL", "XXL"],
+        fit=["slim", "regular", "loose"],
+        material=["cotton", "linen", "polyester"],
+        print=[f"design {number}" for number in range(1000)],
+    )
+
+    print(len(catalog))
+    # Output: 270000
+
+    item = catalog[123_456]
+    print(item)
+    print(catalog.index(item))
+    # Output: 123456
+
+    pprint(list(catalog[:3]))
+
+
 if __name__ == "__main__":
     tshirt_example()
+    # product_catalog_example()
@@ -13,6 +13,156 @@ fly. This means that the entire list is not stored in memory, and the items are
 generated as needed.
 """
 
+import bisect
+import itertools
+import time
+
+
+def fibonacci_lc(count):
+    """List comprehension for fibonacci series
+
+    The list comprehension will return the entire list of fibonacci series.
+    """
+    # Starting from `F(-1), F(0)`, the first number computed is `F(1)`, so the
+    # list begins with 1 and 1, like the generator.
+    a, b = 1, 0
+    return [b := a + (a := b) for _ in range(count)]
+
+
+def fibonacci_gc():
+    """Generator for fibonacci series
+
+    The generator will yield the next number in the series. The series will
+    begin with 1 and 1. The next number will be the sum of the previous two
+    numbers.
+    """
+    a, b = 0, 1
+    while True:
+        yield b
+        a, b = b, a + b
+
+
+def fibonacci_pair(n):
+    """Get the `n`th and the next fibonacci numbers, using fast doubling
+
+    Both generators above have to compute every number before the `n`th. Fast
+    doubling uses the identities `F(2k) = F(k) * (2 * F(k + 1) - F(k))` and
+    `F(2k + 1) = F(k) ** 2 + F(k + 1) ** 2` to go from `k` to `2k` (or `2k + 1`)
+    in one step, following the bits of `n` from the most significant one. It
+    takes O(log n) steps instead of O(n).
+
+    Args:
+        n (`int`): The index of the number, with `F(0) = 0` and `F(1) = 1`.
+
+    Returns:
+        `tuple`: The numbers `F(n)` and `F(n + 1)`.
+
+    Raises:
+        `ValueError`: If `n` is negative.
+    """
+    # `bin` of a negative number starts with "-0b", which the bits would misread
+    if n < 0:
+        raise ValueError("The index must be non-negative")
+    a, b = 0, 1
+    for bit in bin(n)[2:]:
+        c = a * (2 * b - a)
+        d = a * a + b * b
+        a, b = (d, c + d) if bit == "1" else (c, d)
+    return a, b
+
+
+def fibonacci_nth(n):
+    """Get the `n`th fibonacci number, with `F(0) = 0` and `F(1) = 1`
+
+    Raises:
+        `ValueError`: If `n` is negative.
+    """
+    return fibonacci_pair(n)[0]
+
+
+class FibonacciSequence:
+    """The fibonacci series, with random access and resumable generators
+
+    The pair `F(n), F(n + 1)` is enough to resume the series from `n`. The pairs
+    are saved as checkpoints every `checkpoint_interval` numbers while the
+    series is generated, and after every random access. When the series is
+    resumed close after a checkpoint, it continues from there; otherwise the
+    pair is computed with fast doubling. At most `max_checkpoints` are kept,
+    the oldest being dropped first, since the numbers grow large.
+    """
+
+    def __init__(self, checkpoint_interval=1000, max_checkpoints=128):
+        """Initialize the sequence
+
+        Args:
+            checkpoint_interval (`int`): The distance between the checkpoints.
+            max_checkpoints (`int`): The maximum number of checkpoints kept.
+        """
+        self.checkpoint_interval = checkpoint_interval
+        self.max_checkpoints = max_checkpoints
+        self._checkpoints = {}
+        self._indices = []
+
+    def _save_checkpoint(self, n, pair):
+        if n in self._checkpoints:
+            return
+        if len(self._checkpoints) >= self.max_checkpoints:
+            # Dicts keep the insertion order, so the first key is the oldest
+            oldest = next(iter(self._checkpoints))
+            del self._checkpoints[oldest]
+            self._indices.remove(oldest)
+        self._checkpoints[n] = pair
+        bisect.insort(self._indices, n)
+
+    def _pair(self, n):
+        """Get `F(n), F(n + 1)` from the nearest checkpoint, or by fast doubling"""
+        position = bisect.bisect_right(self._indices, n)
+        if position:
+            index = self._indices[position - 1]
+            if n - index <= self.checkpoint_interval:
+                a, b = self._checkpoints[index]
+                for _ in range(n - index):
+                    a, b = b, a + b
+                return a, b
+
+        pair = fibonacci_pair(n)
+        self._save_checkpoint(n, pair)
+        return pair
+
+    def terms(self, start=0):
+        """Generate the series from `F(start)` on
+
+        Args:
+            start (`int`): The index of the first number.
+
+        Yields:
+            `int`: The fibonacci numbers.
+        """
+        a, b = self._pair(start)
+        n = start
+        while True:
+            yield a
+            a, b = b, a + b
+            n += 1
+            if n % self.checkpoint_interval == 0:
+                self._save_checkpoint(n, (a, b))
+
+    def __getitem__(self, index):
+        """Get `F(index)`, or an iterator over a slice of the series
+
+        Like `itertools.islice`, a slice returns an iterator, which starts at
+        the start of the slice without generating the numbers before it.
+        """
+        if isinstance(index, slice):
+            start, stop, step = index.start or 0, index.stop, index.step or 1
+            if start < 0 or (stop is not None and stop < 0) or step < 1:
+                raise ValueError("Indices must be non-negative and step positive")
+            count = None if stop is None else max(0, stop - start)
+            return itertools.islice(self.terms(start), 0, count, step)
+        if index < 0:
+            raise IndexError("The series has no negative indices")
+        return self._pair(index)[0]
+
 
 def fibb_example():
     """Generator Example: Fibbonacci series
@@ -26,26 +176,6 @@ def fibb_example():
     The generator will raise a `StopIteration` exception when it is exhausted, just
     like any other iterator."""
 
-    def fibonacci_lc(count):
-        """List comprehension for fibonacci series
-
-        The list comprehension will return the entire list of fibonacci series.
-        """
-        a, b = 0, 1
-        return [b := a + (a := b) for _ in range(count)]
-
-    def fibonacci_gc():
-        """Generator for fibonacci series
-
-        The generator will yield the next number in the series. The series will
-        begin with 1 and 1. The next number will be the sum of the previous two
-        numbers.
-        """
-        a, b = 0, 1
-        while True:
-            yield b
-            a, b = b, a + b
-
     count = 100
 
     # The loop will wait for the entire list to be generated before printing it
@@ -59,6 +189,37 @@ def fibb_example():
         print(next(fib_gc), end=", ")
 
 
+def fibonacci_benchmark(n=100_000):
+    """Fibonacci benchmark
+
+    Compares the time taken to get the `n`th fibonacci number from the list
+    comprehension, the generator, and fast doubling. The list holds every number
+    up to the `n`th, so its memory grows quadratically with `n`.
+
+    Args:
+        n (`int`): The index of the number.
+    """
+
+    def measure(label, function):
+        start = time.perf_counter()
+        result = function()
+        print(f"{label:20} {time.perf_counter() - start:.4f}s")
+        return result
+
+    print(f"F({n:,})")
+    by_list = measure("List comprehension", lambda: fibonacci_lc(n)[-1])
+    by_generator = measure(
+        "Generator", lambda: next(itertools.islice(fibonacci_gc(), n - 1, None))
+    )
+    by_doubling = measure("Fast doubling", lambda: fibonacci_nth(n))
+
+    sequence = FibonacciSequence()
+    sequence[n]
+    measure("From a checkpoint", lambda: sequence[n + 10])
+
+    assert by_list == by_generator == by_doubling
+
+
 def gen_exp_example():
     """Generator Expression Example
 
@@ -82,3 +243,4 @@ def gen_exp_example():
 if __name__ == "__main__":
     fibb_example()
     gen_exp_example()
+    # fibonacci_benchmark()
@@ -21,9 +21,198 @@ Methods:
 [Chapter_02/07_comparing_list_and_tuple_methods.png]
 """
 
+import functools
+import importlib.util
+import json
+import operator
+import os
+import platform
+import random
+import statistics
 import sys
 import timeit
 
+# The root of the repository, which contains the chapter directories
+BOOK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(statement, number=None, repeat=7, warmup=1):
+    """Measure the time taken to run a statement
+
+    A single `timeit` run is noisy: the first runs pay for cold caches and lazy
+    initialization, and other processes slow down some of the runs. So the
+    statement is first run `warmup` times without being measured, then measured
+    over `repeat` runs of `number` loops each.
+
+    Args:
+        statement (`str` or `function`): The statement to measure.
+        number (`int`): The number of loops of a run, chosen by `autorange` so
+            that a run takes at least 0.2 seconds if `None`.
+        repeat (`int`): The number of measured runs.
+        warmup (`int`): The number of runs that aren't measured.
+
+    Returns:
+        `dict`: The `min`, `median` and `stdev` of the time of a loop in seconds,
+        and the `number` and `repeat` of the measure.
+    """
+
+    timer = timeit.Timer(statement)
+    if number is None:
+        number, _ = timer.autorange()
+    timer.repeat(warmup, number)
+    times = [total / number for total in timer.repeat(repeat, number)]
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "stdev": statistics.stdev(times) if repeat > 1 else 0.0,
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def load_chapter_module(path):
+    """Load a module of a chapter
+
+    The modules are named after their section, like `01_card_deck.py`, so they
+    can't be imported with an `import` statement.
+
+    Args:
+        path (`str`): The path of the module, relative to the root of the book.
+
+    Returns:
+        `module`: The loaded module.
+    """
+
+    name = os.path.splitext(path)[0].replace(os.sep, ".").replace("/", ".")
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.spec_from_file_location(name, os.path.join(BOOK_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    # Registered before running it, like an imported module
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def get_benchmark_suite():
+    """Get the benchmarks of the hot functions of the first two chapters
+
+    Returns:
+        `dict`: The statement to measure, by benchmark name.
+    """
+
+    card_deck = load_chapter_module("Chapter_01/01_card_deck.py")
+    vector_2d = load_chapter_module("Chapter_01/02_vector_2d.py")
+    reports = load_chapter_module("Chapter_02/08_unpacking_sequences.py")
+
+    deck = card_deck.FrenchDeck()
+    shuffled_deck = random.sample(list(deck), len(deck))
+    vectors = [vector_2d.Vector2(i, -i) for i in range(1000)]
+    vector_array = vector_2d.Vector2Array.from_vectors(vectors)
+    nums = list(range(1000))
+    records = reports.get_student_data()
+    render = reports.compile_template(reports.get_report_template())
+
+    def get_evens_with_loop():
+        evens = []
+        for num in nums:
+            if num % 2 == 0:
+                evens.append(num)
+        return evens
+
+    return {
+        "tuple_generation": "(1, 2, 3, 4, 5,)",
+        "list_generation": "[1, 2, 3, 4, 5]",
+        "french_deck_indexing": lambda: [deck[i] for i in range(len(deck))],
+        "french_deck_filter_by_rank": lambda: deck.filter_by_rank("Q"),
+        "french_deck_sorted": lambda: sorted(shuffled_deck, key=deck.sort_key),
+        "french_deck_get_sorted": deck.get_sorted,
+        "vector2_add": lambda: functools.reduce(operator.add, vectors),
+        "vector2_scale": lambda: [vector * 3 for vector in vectors],
+        "vector2_array_add": lambda: vector_array + vector_array,
+        "vector2_array_scale": lambda: vector_array * 3,
+        "evens_with_loop": get_evens_with_loop,
+        "evens_with_lc": lambda: [num for num in nums if num % 2 == 0],
+        "evens_with_filter": lambda: list(filter(lambda x: x % 2 == 0, nums)),
+        "sum_of_generator": lambda: sum(num * num for num in nums),
+        "sum_of_list": lambda: sum([num * num for num in nums]),
+        "report_generation": lambda: [
+            render(reports.get_report_data(record)) for record in records
+        ],
+    }
+
+
+def run_benchmarks(path=None, names=None, **kwargs):
+    """Run the benchmark suite and save the results
+
+    Args:
+        path (`str`): The path of the JSON results file, not saved if `None`.
+        names (`iterable`): The names of the benchmarks to run, all if `None`.
+        kwargs: The `number`, `repeat` and `warmup` of `measure`.
+
+    Returns:
+        `dict`: The results, with the measure of each benchmark.
+    """
+
+    suite = get_benchmark_suite()
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": {},
+    }
+    for name in names or suite:
+        result = results["benchmarks"][name] = measure(suite[name], **kwargs)
+        print(
+            f"{name:28} min {result['min'] * 1e6:11.3f} us"
+            f"  median {result['median'] * 1e6:11.3f} us"
+            f"  stdev {result['stdev'] * 1e6:9.3f} us"
+        )
+
+    if path:
+        with open(path, "w") as file:
+            json.dump(results, file, indent=2)
+    return results
+
+
+def compare_benchmarks(baseline_path, path, threshold=0.1):
+    """Compare two benchmark results files
+
+    The minimum time of each benchmark is compared, since it's the least
+    affected by the noise of the other processes.
+
+    Args:
+        baseline_path (`str`): The path of the baseline results.
+        path (`str`): The path of the results to compare with the baseline.
+        threshold (`float`): The relative slowdown above which a benchmark
+            is flagged as a regression.
+
+    Returns:
+        `list`: The names of the benchmarks that regressed.
+    """
+
+    with open(baseline_path) as file:
+        baseline = json.load(file)["benchmarks"]
+    with open(path) as file:
+        current = json.load(file)["benchmarks"]
+
+    regressions = []
+    for name, baseline_result in baseline.items():
+        if name not in current:
+            print(f"{name:28} missing")
+            continue
+
+        ratio = current[name]["min"] / baseline_result["min"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "improvement"
+        print(f"{name:28} {ratio:6.2f}x  {flag}")
+
+    return regressions
+
 
 def tuple_vs_list_generation_time():
     """Tuple vs List generation time
@@ -31,11 +220,12 @@ def tuple_vs_list_generation_time():
     This function demonstrates the time taken to generate a tuple and a list.
     """
 
-    print("Tuple generation time:")
-    print(timeit.timeit("(1, 2, 3, 4, 5,)", number=1000000))
-
-    print("\nList generation time:")
-    print(timeit.timeit("[1, 2, 3, 4, 5]", number=1000000))
+    statements = (("Tuple", "(1, 2, 3, 4, 5,)"), ("List", "[1, 2, 3, 4, 5]"))
+    for label, statement in statements:
+        result = measure(statement, number=1000000)
+        print(f"{label} generation time:")
+        print(f"min {result['min'] * 1e9:.1f} ns", end=", ")
+        print(f"median {result['median'] * 1e9:.1f} ns")
 
 
 def tuple_vs_list_copy():
@@ -74,3 +264,5 @@ if __name__ == "__main__":
     tuple_vs_list_generation_time()
     tuple_vs_list_copy()
     tuple_vs_list_memory()
+    # run_benchmarks("benchmarks.json")
+    # compare_benchmarks("baseline.json", "benchmarks.json")
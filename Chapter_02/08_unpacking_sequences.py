@@ -6,7 +6,21 @@ Unpacking allows us to assign the elements of a sequence to multiple variables i
 single statement. We can unpack any iterable object like lists, tuples, strings, etc.
 """
 
+import array
+import bisect
+import concurrent.futures
+import functools
+import hashlib
+import io
+import itertools
+import json
+import math
+import operator
 import os
+import random
+import string
+import tarfile
+import zipfile
 from collections import namedtuple
 import datetime
 
@@ -34,157 +48,675 @@ def swapping_example():
     print(f"After swapping: a = {a}, b = {b}")
 
 
-def reports_example():
-    """Unpacking Reports Example
+STUDENT_DATA_FILENAME = "08_student_data.txt"
+STUDENT_REPORT_TEMPLATE_FILENAME = "08_student_report_template.txt"
+STUDENT_REPORTS_DIR = "08_student_reports"
+STUDENT_REPORTS_MANIFEST_FILENAME = "manifest.json"
+PER_SUBJECT_MARKS = 100
 
-    This function demonstrates the use of unpacking to generate reports for students.
+# The lower bounds of the percentage of each grade, in ascending order. A grade
+# applies from its threshold up to the threshold of the next grade, and "F" below
+# the lowest one, i.e. `GRADES[bisect.bisect_right(GRADE_THRESHOLDS, percentage)]`.
+GRADE_THRESHOLDS = (40, 50, 60, 70, 80)
+GRADES = ("F", "D", "C", "B", "A", "A+")
+
+
+def get_grade(percentage):
+    """Get the grade of a percentage
+
+    `bisect` finds the number of thresholds that the percentage reaches in
+    O(log n), which is the position of its grade in `GRADES`.
+
+    Args:
+        percentage (`float`): The percentage of the student.
+
+    Returns:
+        `str`: The grade.
     """
 
-    STUDENT_DATA_FILENAME = "08_student_data.txt"
-    STUDENT_REPORT_TEMPLATE_FILENAME = "08_student_report_template.txt"
-    STUDENT_REPORTS_DIR = "08_student_reports"
-    PER_SUBJECT_MARKS = 100
+    return GRADES[bisect.bisect_right(GRADE_THRESHOLDS, percentage)]
 
-    def get_student_data():
-        """Get the student data
 
-        Returns:
-            `tuple`: The student records.
-        """
+# The helpers of the reports example are defined at the module level rather than
+# inside `reports_example`, because the worker processes of a process pool can
+# only run functions that can be pickled, i.e. imported by their name.
+
+
+def get_student_data():
+    """Get the student data
+
+    Returns:
+        `tuple`: The student records.
+    """
+
+    filepath = os.path.join(os.path.dirname(__file__), STUDENT_DATA_FILENAME)
+
+    with open(filepath, "r") as file:
+
+        # Use _ to ignore the header, and * to pack the rest of the lines into a list
+        _, *body = file.readlines()
+
+        raw_records = tuple(tuple(line.strip().split(", ")) for line in body)
+
+        # Unpack the raw records to get the student ID, student name, and marks in order
+        # to convert the numeric properties to integers.
+        records = tuple(
+            (int(student_id), student_name, *map(int, marks))
+            for student_id, student_name, *marks in raw_records
+        )
+
+        return records
+
+
+def get_report_template():
+    """Get the report template
+
+    Returns:
+        `str`: The report template string with data placeholders.
+    """
+
+    filepath = os.path.join(os.path.dirname(__file__), STUDENT_REPORT_TEMPLATE_FILENAME)
+
+    with open(filepath, "r") as file:
+        return file.read()
+
+
+def get_report_filename(student_id, student_name):
+    """Get the name of the report file of a student
+
+    Args:
+        student_id (`int`): The ID of the student.
+        student_name (`str`): The name of the student.
+
+    Returns:
+        `str`: The name of the report file.
+    """
+
+    return f"{student_id:03}_{student_name}.txt"
+
+
+def get_report_filepath(student_id, student_name):
+    """Get the path of the report file of a student
+
+    Args:
+        student_id (`int`): The ID of the student.
+        student_name (`str`): The name of the student.
+
+    Returns:
+        `str`: The path of the report file.
+    """
+
+    return os.path.join(
+        os.path.dirname(__file__),
+        STUDENT_REPORTS_DIR,
+        get_report_filename(student_id, student_name),
+    )
+
+
+@functools.lru_cache
+def compile_template(template):
+    """Compile a report template into a render function
+
+    `template.format(**data)` parses the template every time it is called. Here
+    the template is parsed once with `string.Formatter().parse`, which splits it
+    into literal text and `{field:format_spec}` placeholders. The placeholders
+    are renamed to positional parameters and the template is turned into the
+    source of an f-string, which is compiled once into a function. Rendering is
+    then a call of that function with the values picked from the data by an
+    `operator.itemgetter`.
+
+    The result is cached, so each process compiles a template only once.
+
+    Args:
+        template (`str`): The template with named placeholders.
+
+    Returns:
+        `function`: A function that takes the data `dict` and returns the report.
+
+    Raises:
+        `ValueError`: If a placeholder isn't a plain name, or has a nested
+        placeholder in its format specification.
+    """
+
+    def escape(literal):
+        return literal.replace("{", "{{").replace("}", "}}")
+
+    field_names = []
+    source = []
+    for literal, field_name, format_spec, conversion in string.Formatter().parse(
+        template
+    ):
+        source.append(escape(literal))
+        if field_name is None:
+            continue
+        if not field_name.isidentifier() or "{" in format_spec:
+            raise ValueError(f"Unsupported placeholder: {field_name!r}")
+
+        parameter = f"_{len(field_names)}"
+        field_names.append(field_name)
+        conversion = f"!{conversion}" if conversion else ""
+        format_spec = f":{format_spec}" if format_spec else ""
+        source.append(f"{{{parameter}{conversion}{format_spec}}}")
 
-        filepath = os.path.join(os.path.dirname(__file__), STUDENT_DATA_FILENAME)
+    parameters = ", ".join(f"_{i}" for i in range(len(field_names)))
+    render_values = eval(f"lambda {parameters}: f{''.join(source)!r}")
 
-        with open(filepath, "r") as file:
+    if not field_names:
+        return lambda data: render_values()
 
-            # Use _ to ignore the header, and * to pack the rest of the lines into a list
-            _, *body = file.readlines()
+    get_values = operator.itemgetter(*field_names)
+    if len(field_names) == 1:
+        return lambda data: render_values(get_values(data))
+    return lambda data: render_values(*get_values(data))
+
+
+def write_report_to_file(data, template):
+    """Write the report to a file
+
+    Args:
+        data (`dict`): The data for the report.
+        template (`str`): The template for the report.
+    """
+
+    filepath = get_report_filepath(data.get("student_id"), data.get("student_name"))
+
+    with open(filepath, "w") as file:
+        file.write(compile_template(template)(data))
+
+
+def get_report_data(record):
+    """Get the data for the report of a student
+
+    Args:
+        record (`tuple`): The record of the student.
+
+    Returns:
+        `dict`: The data for the report.
+    """
 
-            raw_records = tuple(tuple(line.strip().split(", ")) for line in body)
+    student_id, name, *marks = record
+    obtained_marks = sum(marks)
+    total_marks = PER_SUBJECT_MARKS * len(marks)
+    percentage = obtained_marks / total_marks * 100
 
-            # Unpack the raw records to get the student ID, student name, and marks in order
-            # to convert the numeric properties to integers.
-            records = tuple(
-                (int(student_id), student_name, *map(int, marks))
-                for student_id, student_name, *marks in raw_records
+    grade = get_grade(percentage)
+
+    maths, english, physics, chemistry, art = marks
+
+    # The `strftime` method is used to format a date object as a string as we want.
+    report_generation_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    data = {
+        "student_id": student_id,
+        "student_name": name,
+        "maths": maths,
+        "english": english,
+        "physics": physics,
+        "chemistry": chemistry,
+        "art": art,
+        "obtained_marks": obtained_marks,
+        "total_marks": total_marks,
+        "percentage": percentage,
+        "grade": grade,
+        "report_generation_time": report_generation_time,
+    }
+
+    return data
+
+
+def generate_report(record, template):
+    """Generate the report for a student
+
+    Creates a report for a student based on the record and the template.
+
+    Args:
+        record (`tuple`): The record of the student.
+        template (`str`): The template for the report.
+
+    Returns:
+        `str`: The report info for the student.
+    """
+
+    data = get_report_data(record)
+    write_report_to_file(data, template)
+
+    return (
+        f"Student ID: {data['student_id']:03},\tName: {data['student_name']}"
+        f"\tTotal Marks: {data['obtained_marks']}"
+    )
+
+
+def get_manifest_filepath():
+    """Get the path of the manifest of the generated reports"""
+
+    return os.path.join(
+        os.path.dirname(__file__),
+        STUDENT_REPORTS_DIR,
+        STUDENT_REPORTS_MANIFEST_FILENAME,
+    )
+
+
+def load_manifest():
+    """Load the manifest of the generated reports
+
+    The manifest maps the report file name of each student to the hash of the
+    record and the template that the report was generated from.
+
+    Returns:
+        `dict`: The manifest, empty if no reports were generated yet.
+    """
+
+    try:
+        with open(get_manifest_filepath(), "r") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def save_manifest(manifest):
+    """Save the manifest of the generated reports
+
+    Args:
+        manifest (`dict`): The manifest to be saved.
+    """
+
+    with open(get_manifest_filepath(), "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+
+
+def generate_reports(records, template, workers=1, incremental=False):
+    """Generate the reports for many students
+
+    With `workers` greater than 1, the reports are generated by a pool of worker
+    processes. The records are handed out to the workers in chunks, so that the
+    cost of sending each task to a process is shared by many records.
+
+    With `incremental`, a report is only generated again if its record or the
+    template changed since the last run, or if its file is missing. We can't
+    compare the reports themselves because they contain the time they were
+    generated at, so the manifest keeps a hash of the inputs of each report.
+
+    Args:
+        records (`tuple`): The records of the students.
+        template (`str`): The template for the reports.
+        workers (`int`): The number of worker processes.
+        incremental (`bool`): Whether to skip the unchanged reports.
+
+    Returns:
+        `tuple`: The report info of the generated reports.
+    """
+
+    manifest = load_manifest() if incremental else {}
+    template_hash = hashlib.sha256(template.encode()).digest()
+
+    pending = []
+    for record in records:
+        student_id, name, *_ = record
+        filepath = get_report_filepath(student_id, name)
+        key = get_report_filename(student_id, name)
+        record_hash = hashlib.sha256(template_hash + repr(record).encode()).hexdigest()
+
+        if manifest.get(key) == record_hash and os.path.exists(filepath):
+            continue
+
+        manifest[key] = record_hash
+        pending.append(record)
+
+    if workers > 1 and len(pending) > 1:
+        chunksize = max(1, len(pending) // (workers * 4))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            reports = tuple(
+                executor.map(
+                    generate_report,
+                    pending,
+                    itertools.repeat(template),
+                    chunksize=chunksize,
+                )
             )
+    else:
+        reports = tuple(generate_report(record, template) for record in pending)
 
-            return records
+    if incremental:
+        save_manifest(manifest)
 
-    def get_report_template():
-        """Get the report template
+    return reports
 
-        Returns:
-            `str`: The report template string with data placeholders.
-        """
 
-        filepath = os.path.join(
-            os.path.dirname(__file__), STUDENT_REPORT_TEMPLATE_FILENAME
-        )
+class ZipReportSink:
+    """Write reports as the members of a zip archive"""
 
-        with open(filepath, "r") as file:
-            return file.read()
+    def __init__(self, path):
+        self._archive = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
 
-    def write_report_to_file(data, template):
-        """Write the report to a file
+    def write(self, name, report):
+        self._archive.writestr(name, report)
 
-        Args:
-            data (`dict`): The data for the report.
-            template (`str`): The template for the report.
-        """
+    def close(self):
+        self._archive.close()
 
-        student_id = data.get("student_id")
-        student_name = data.get("student_name")
 
-        filepath = os.path.join(
-            os.path.dirname(__file__),
-            STUDENT_REPORTS_DIR,
-            f"{student_id:03}_{student_name}.txt",
-        )
+class TarReportSink:
+    """Write reports as the members of a gzipped tar archive"""
+
+    def __init__(self, path):
+        self._archive = tarfile.open(path, "w:gz")
+
+    def write(self, name, report):
+        content = report.encode()
+        info = tarfile.TarInfo(name)
+        info.size = len(content)
+        self._archive.addfile(info, io.BytesIO(content))
+
+    def close(self):
+        self._archive.close()
+
+
+class ConcatenatedReportSink:
+    """Write reports one after another into a single file
+
+    The byte offset and length of each report are saved in an index file next
+    to it (`<path>.index`), one tab separated `name offset length` per line, so
+    that a report can be read without scanning the file. See `ReportReader`.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "wb")
+        self._index = open(f"{path}.index", "w")
+
+    def write(self, name, report):
+        # A tab or a newline in the name would split its line of the index
+        if "\t" in name or "\n" in name:
+            raise ValueError(f"Report name contains a tab or a newline: {name!r}")
+        content = report.encode()
+        self._index.write(f"{name}\t{self._file.tell()}\t{len(content)}\n")
+        self._file.write(content)
+
+    def close(self):
+        self._file.close()
+        self._index.close()
+
+
+REPORT_SINKS = {
+    "zip": ZipReportSink,
+    "tar": TarReportSink,
+    "concat": ConcatenatedReportSink,
+}
+
+
+class ReportReader:
+    """Read reports from a file written by `ConcatenatedReportSink`
+
+    The index is loaded once into a dict, so looking up a report is a dict
+    lookup followed by a single seek and read, whatever the number of reports.
+
+    Example:
+        with ReportReader(path) as reader:
+            report = reader.read("001_Alice.txt")
+    """
+
+    def __init__(self, path):
+        """Load the index of the reports and open their file
+
+        Args:
+            path (`str`): The path of the concatenated reports file.
+        """
+        self._offsets = {}
+        with open(f"{path}.index", "r") as index:
+            for line in index:
+                name, offset, length = line.rstrip("\n").split("\t")
+                self._offsets[name] = (int(offset), int(length))
+        self._file = open(path, "rb")
 
-        with open(filepath, "w") as file:
-            file.write(template.format(**data))
+    def __len__(self):
+        return len(self._offsets)
 
-    def generate_report(record, template):
-        """Generate the report for a student
+    def __contains__(self, name):
+        return name in self._offsets
 
-        Creates a report for a student based on the record and the template.
+    def read(self, name):
+        """Read a report
 
         Args:
-            record (`tuple`): The record of the student.
-            template (`str`): The template for the report.
+            name (`str`): The name of the report.
 
         Returns:
-            `str`: The report info for the student.
+            `str`: The report.
+
+        Raises:
+            `KeyError`: If there is no report with the name.
         """
+        offset, length = self._offsets[name]
+        self._file.seek(offset)
+        return self._file.read(length).decode()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_report(path, name):
+    """Read a single report from a file written by `ConcatenatedReportSink`
+
+    This loads the whole index, so use a `ReportReader` to read several reports.
+
+    Args:
+        path (`str`): The path of the concatenated reports file.
+        name (`str`): The name of the report.
+
+    Returns:
+        `str`: The report.
+
+    Raises:
+        `KeyError`: If there is no report with the name.
+    """
+
+    with ReportReader(path) as reader:
+        return reader.read(name)
+
+
+def archive_reports(records, template, path, archive_format="zip"):
+    """Generate the reports for many students into a single archive
+
+    Creating hundreds of thousands of small files is slow, so the reports are
+    rendered with the compiled template and written to a single zip or tar
+    archive, or a single concatenated file with an index.
+
+    Args:
+        records (`tuple`): The records of the students.
+        template (`str`): The template for the reports.
+        path (`str`): The path of the archive.
+        archive_format (`str`): One of `"zip"`, `"tar"` or `"concat"`.
+
+    Returns:
+        `int`: The number of reports written.
+    """
+
+    render = compile_template(template)
+    sink = REPORT_SINKS[archive_format](path)
+    count = 0
+    try:
+        for record in records:
+            data = get_report_data(record)
+            name = get_report_filename(data["student_id"], data["student_name"])
+            sink.write(name, render(data))
+            count += 1
+    finally:
+        sink.close()
+
+    return count
+
+
+# The student data stored column by column. `ids` is an `array.array` of type
+# code `I` (unsigned int), `names` is a list, and `marks` maps each subject name
+# in lowercase to an `array.array` of type code `H` (unsigned short, 2 bytes).
+StudentColumns = namedtuple("StudentColumns", ["ids", "names", "marks"])
+
+SubjectStats = namedtuple("SubjectStats", ["minimum", "maximum", "mean"])
+
+CohortResults = namedtuple(
+    "CohortResults", ["totals", "percentages", "grades", "subject_stats"]
+)
+
+
+def get_student_columns():
+    """Get the student data as columns
+
+    `get_student_data` keeps a tuple per student, with a separate `int` object for
+    each of the marks. Here each column is a flat `array.array`, so a mark takes 2
+    bytes. The file is read line by line instead of with `readlines()`.
+
+    Returns:
+        `StudentColumns`: The student data.
+    """
 
-        student_id, name, *marks = record
-        obtained_marks = sum(marks)
-        total_marks = PER_SUBJECT_MARKS * len(marks)
-        percentage = obtained_marks / total_marks * 100
-
-        grade_map = ((80, "A+"), (70, "A"), (60, "B"), (50, "C"), (40, "D"))
-
-        # Get the grade based on the percentage. We iterate through the grade_map
-        # from the highest percentage to the lowest percentage and filter the grade
-        # based on the percentage. Making use of generator expression will avoid the
-        # need to evaluate all the valid grades at once. The we use the `next()` function
-        # to get the first valid grade, and if we encounter the `StopIteration` exception,
-        # consider the lowest i.e. "F" grade.
-        grade = next((grade for tresh, grade in grade_map if percentage >= tresh), "F")
-
-        maths, english, physics, chemistry, art = marks
-
-        # The `strftime` method is used to format a date object as a string as we want.
-        report_generation_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        data = {
-            "student_id": student_id,
-            "student_name": name,
-            "maths": maths,
-            "english": english,
-            "physics": physics,
-            "chemistry": chemistry,
-            "art": art,
-            "obtained_marks": obtained_marks,
-            "total_marks": total_marks,
-            "percentage": percentage,
-            "grade": grade,
-            "report_generation_time": report_generation_time,
-        }
-
-        write_report_to_file(data, template)
-
-        return (
-            f"Student ID: {student_id:03},\tName: {name}\tTotal Marks: {obtained_marks}"
+    filepath = os.path.join(os.path.dirname(__file__), STUDENT_DATA_FILENAME)
+
+    with open(filepath, "r") as file:
+        _, _, *subjects = file.readline().strip().split(", ")
+
+        ids = array.array("I")
+        names = []
+        marks = {subject.lower(): array.array("H") for subject in subjects}
+        subject_columns = tuple(marks.values())
+
+        for line in file:
+            student_id, student_name, *student_marks = line.strip().split(", ")
+            ids.append(int(student_id))
+            names.append(student_name)
+            for column, mark in zip(subject_columns, student_marks):
+                column.append(int(mark))
+
+    return StudentColumns(ids, names, marks)
+
+
+def grade_cohort(columns):
+    """Compute the results of all the students at once
+
+    Instead of computing the results of one student at a time, the marks are
+    processed column by column: a single pass over each subject's column gives
+    both the totals and the subject's statistics. The percentages and grades
+    are then computed with `map` over whole columns, and the grades are looked
+    up with `bisect`, like `get_grade`.
+
+    Args:
+        columns (`StudentColumns`): The student data.
+
+    Returns:
+        `CohortResults`: The total marks, percentage and grade of each student,
+        and the statistics of each subject.
+    """
+
+    count = len(columns.ids)
+    total_marks = PER_SUBJECT_MARKS * len(columns.marks)
+
+    # Each column is read once, adding the marks to the totals of the students
+    # and updating the statistics of the subject in the same pass.
+    totals = array.array("I", itertools.repeat(0, count))
+    subject_stats = {}
+    for subject, column in columns.marks.items():
+        minimum = maximum = column[0] if count else 0
+        subject_sum = 0
+        for index, mark in enumerate(column):
+            totals[index] += mark
+            subject_sum += mark
+            if mark < minimum:
+                minimum = mark
+            elif mark > maximum:
+                maximum = mark
+        subject_stats[subject] = SubjectStats(
+            minimum, maximum, subject_sum / count if count else 0.0
         )
 
+    percentages = array.array(
+        "d",
+        map(
+            operator.mul,
+            map(operator.truediv, totals, itertools.repeat(total_marks)),
+            itertools.repeat(100),
+        ),
+    )
+
+    grade_indices = map(
+        functools.partial(bisect.bisect_right, GRADE_THRESHOLDS), percentages
+    )
+    grades = list(map(GRADES.__getitem__, grade_indices))
+
+    return CohortResults(totals, percentages, grades, subject_stats)
+
+
+def cohort_example():
+    """Cohort Example
+
+    This function computes the results of all the students from the columns.
+    """
+
+    columns = get_student_columns()
+    results = grade_cohort(columns)
+
+    for student_id, name, total, percentage, grade in zip(
+        columns.ids, columns.names, *results[:3]
+    ):
+        print(f"{student_id:03} {name:10} {total:4} {percentage:6.2f}% {grade}")
+
+    for subject, stats in results.subject_stats.items():
+        print(f"{subject:10} {stats}")
+
+
+def reports_example(workers=1, incremental=False):
+    """Unpacking Reports Example
+
+    This function demonstrates the use of unpacking to generate reports for students.
+
+    Args:
+        workers (`int`): The number of worker processes.
+        incremental (`bool`): Whether to skip the unchanged reports.
+    """
+
     records = get_student_data()
     template = get_report_template()
-    reports = tuple(generate_report(record, template) for record in records)
+    reports = generate_reports(records, template, workers, incremental)
     print("\n".join(reports))
+    print(f"Generated {len(reports)} of {len(records)} reports")
 
 
-def gcd_example():
-    """GCD Example
+def archive_reports_example():
+    """Archive Reports Example
 
-    This function demonstrates the use of unpacking to calculate the GCD of two numbers.
+    This function generates the reports of all the students into a zip archive.
     """
 
-    def eucliedean_gcd(a, b):
-        """Calculate the GCD of two numbers
+    path = os.path.join(os.path.dirname(__file__), "08_student_reports.zip")
+    count = archive_reports(get_student_data(), get_report_template(), path)
+    print(f"Archived {count} reports to {path}")
 
-        Makes use of the Euclidean algorithm to calculate the GCD of two numbers.
 
-        Args:
-            a (`int`): The first number.
-            b (`int`): The second number.
+def eucliedean_gcd(a, b):
+    """Calculate the GCD of two numbers
 
-        Returns:
-            `int`: The GCD of the two numbers.
-        """
+    Makes use of the Euclidean algorithm to calculate the GCD of two numbers.
+
+    Args:
+        a (`int`): The first number.
+        b (`int`): The second number.
+
+    Returns:
+        `int`: The GCD of the two numbers.
+    """
+
+    while b:
+        a, b = b, a % b
+    return a
 
-        while b:
-            a, b = b, a % b
-        return a
+
+def gcd_example():
+    """GCD Example
+
+    This function demonstrates the use of unpacking to calculate the GCD of two numbers.
+    """
 
     def gcd(a, *nums):
         """Calculate the GCD of multiple numbers
@@ -217,8 +749,171 @@ def gcd_example():
     expression = "gcd(10, 20, 30, 40, 50)"
     print(f"{expression} = {eval(expression)}")
 
+    # Each call of the recursive `gcd` copies the rest of the numbers into a new
+    # list, and makes one more nested call, so it is O(n^2) and can't go past the
+    # recursion limit. `gcd_reduce` has neither problem.
+    print(f"gcd_reduce([10, 20, 30, 40, 50]) = {gcd_reduce([10, 20, 30, 40, 50])}")
+
+
+def gcd_reduce(numbers, chunk_size=4096):
+    """Calculate the GCD of a stream of numbers
+
+    The numbers are taken `chunk_size` at a time and passed to `math.gcd`, which
+    accepts any number of arguments, together with the GCD so far. Once the GCD
+    is 1 it can't change anymore, so the rest of the numbers are not read.
+
+    Args:
+        numbers (`iterable`): The numbers.
+        chunk_size (`int`): The number of numbers passed to `math.gcd` at once.
+
+    Returns:
+        `int`: The GCD of the numbers, 0 if there are none.
+    """
+
+    numbers = iter(numbers)
+    result = 0
+    while chunk := tuple(itertools.islice(numbers, chunk_size)):
+        result = math.gcd(result, *chunk)
+        if result == 1:
+            break
+    return result
+
+
+def lcm_reduce(numbers, chunk_size=4096):
+    """Calculate the LCM of a stream of numbers
+
+    Like `gcd_reduce`, but with `math.lcm`. Once the LCM is 0, i.e. one of the
+    numbers is 0, it can't change anymore, so the rest of the numbers are not read.
+
+    Args:
+        numbers (`iterable`): The numbers.
+        chunk_size (`int`): The number of numbers passed to `math.lcm` at once.
+
+    Returns:
+        `int`: The LCM of the numbers, 1 if there are none.
+    """
+
+    numbers = iter(numbers)
+    result = 1
+    while chunk := tuple(itertools.islice(numbers, chunk_size)):
+        result = math.lcm(result, *chunk)
+        if result == 0:
+            break
+    return result
+
+
+def _pairwise_gcd_chunk(a, b):
+    return array.array(a.typecode, map(math.gcd, a, b))
+
+
+def pairwise_gcd(a, b, workers=1, chunk_size=1_000_000):
+    """Calculate the GCD of each pair of numbers of two arrays
+
+    With `workers` greater than 1, the arrays are split into slices of
+    `chunk_size` pairs, and the GCDs of each slice are calculated by a worker
+    process, like in `parallel_gcd`.
+
+    Args:
+        a (`array.array`): The first numbers.
+        b (`array.array`): The second numbers.
+        workers (`int`): The number of worker processes.
+        chunk_size (`int`): The number of pairs in each slice.
+
+    Returns:
+        `array.array`: The GCD of each pair, with the type code of `a`.
+
+    Raises:
+        `ValueError`: If the arrays don't have the same length.
+    """
+
+    if len(a) != len(b):
+        raise ValueError(f"The arrays have different lengths: {len(a)} and {len(b)}")
+    if workers <= 1:
+        return _pairwise_gcd_chunk(a, b)
+
+    starts = range(0, len(a), chunk_size)
+    a_chunks = (a[start : start + chunk_size] for start in starts)
+    b_chunks = (b[start : start + chunk_size] for start in starts)
+    result = array.array(a.typecode)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk in executor.map(_pairwise_gcd_chunk, a_chunks, b_chunks):
+            result.extend(chunk)
+    return result
+
+
+def parallel_gcd(numbers, workers=None, chunk_size=1_000_000):
+    """Calculate the GCD of a large array of numbers with a pool of processes
+
+    The array is split into slices of `chunk_size` numbers, and the GCD of each
+    slice is calculated by a worker process. The GCD of the results is the GCD
+    of all the numbers. Slices of an `array.array` are arrays too, which are
+    cheap to send to a process.
+
+    Args:
+        numbers (`array.array`): The numbers.
+        workers (`int`): The number of worker processes, the number of CPUs if `None`.
+        chunk_size (`int`): The number of numbers in each slice.
+
+    Returns:
+        `int`: The GCD of the numbers, 0 if there are none.
+    """
+
+    chunks = (
+        numbers[start : start + chunk_size]
+        for start in range(0, len(numbers), chunk_size)
+    )
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        return gcd_reduce(executor.map(gcd_reduce, chunks))
+
+
+def verify_gcd_reducers(count=10_000, workers=2):
+    """Check the GCD and LCM reducers against `eucliedean_gcd`
+
+    `eucliedean_gcd` is the reference implementation: the results of
+    `gcd_reduce`, `lcm_reduce`, `pairwise_gcd` and `parallel_gcd` are compared
+    with it on random numbers, including zeros, and on the edge cases.
+
+    Args:
+        count (`int`): The number of random numbers.
+        workers (`int`): The number of worker processes of the parallel modes.
+
+    Raises:
+        `AssertionError`: If a result differs from the reference.
+    """
+
+    def reference_lcm(a, b):
+        return a * b // eucliedean_gcd(a, b) if a and b else 0
+
+    numbers = array.array("Q", (random.randrange(1000) * 6 for _ in range(count)))
+    others = array.array("Q", (random.randrange(1000) for _ in range(count)))
+    small_numbers = numbers[:20]
+
+    reference = functools.reduce(eucliedean_gcd, numbers, 0)
+    assert gcd_reduce(numbers, chunk_size=7) == reference
+    assert parallel_gcd(numbers, workers, chunk_size=count // 8) == reference
+    assert gcd_reduce([]) == 0 and parallel_gcd(array.array("Q"), workers) == 0
+    assert gcd_reduce([7, 14, 1, 3]) == 1
+
+    for values in (small_numbers, [0, 5], [4, 6, 10], []):
+        assert lcm_reduce(values, chunk_size=3) == functools.reduce(
+            reference_lcm, values, 1
+        )
+
+    expected = array.array("Q", map(eucliedean_gcd, numbers, others))
+    assert pairwise_gcd(numbers, others) == expected
+    assert pairwise_gcd(numbers, others, workers, chunk_size=count // 8) == expected
+    try:
+        pairwise_gcd(numbers, others[:-1])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("pairwise_gcd accepted arrays of different lengths")
+
 
 if __name__ == "__main__":
     swapping_example()
     reports_example()
+    # archive_reports_example()
+    # cohort_example()
     gcd_example()
+    # verify_gcd_reducers()
@@ -1,16 +1,36 @@
+"""Format Specifications
+
+This module demonstrates the use of format specifications to render tables.
+"""
+
+import bisect
+import concurrent.futures
+import heapq
+import itertools
+import math
+import numbers
+import random
+import re
+import sys
+import time
+from collections import namedtuple
+
+METRO_AREAS = (
+    ("Tokyo", "JP", 36.933, (35.689722, 139.691667)),
+    ("Delhi NCR", "IN", 21.935, (28.613889, 77.208889)),
+    ("Mexico City", "MX", 20.142, (19.433333, -99.133333)),
+    ("New York-Newark", "US", 20.104, (40.808611, -74.020386)),
+    ("São Paulo", "BR", 19.649, (-23.547778, -46.635833)),
+)
+
+
 def metro_areas_table_example():
     """Metro Areas Table Example
 
     This function demonstrates the use of format specifications to create a table of metro areas.
     """
 
-    metro_areas = (
-        ("Tokyo", "JP", 36.933, (35.689722, 139.691667)),
-        ("Delhi NCR", "IN", 21.935, (28.613889, 77.208889)),
-        ("Mexico City", "MX", 20.142, (19.433333, -99.133333)),
-        ("New York-Newark", "US", 20.104, (40.808611, -74.020386)),
-        ("São Paulo", "BR", 19.649, (-23.547778, -46.635833)),
-    )
+    metro_areas = METRO_AREAS
 
     print(f"{'Area':15} | {'Latitude':>9} | {'Longitude':>9}")
     print(f"{'-'*16}+{'-'*11}+{'-'*10}")
@@ -20,5 +40,462 @@ def metro_areas_table_example():
             print(f"{f'{name}':15} | {latitude:9.4f} | {longitude:9.4f}")
 
 
+# A column of a table: its title, the function that gets its value from a row,
+# and the format specification of the value, e.g. `.4f` or `>+,.2f`. A width in
+# the format specification is the minimum width of the column.
+Column = namedtuple("Column", ["title", "get", "format_spec"])
+
+# The standard format specification, split around its width:
+# `[[fill]align][sign][z][#][0][width][grouping][.precision][type]`
+FORMAT_SPEC_PATTERN = re.compile(
+    r"(?P<prefix>(?:.?(?P<align>[<>=^]))?[-+ ]?z?#?0?)"
+    r"(?P<width>\d*)"
+    r"(?P<suffix>[,_]?(?:\.\d+)?[bcdeEfFgGnosxX%]?)",
+    re.DOTALL,
+)
+
+
+def split_format_spec(format_spec):
+    """Split a format specification around its width
+
+    Args:
+        format_spec (`str`): The format specification.
+
+    Returns:
+        `tuple`: The part before the width, the width as an `int` (0 if there
+        is none), the part after the width, and the alignment (`None` if there
+        is none).
+
+    Raises:
+        `ValueError`: If the format specification doesn't follow the standard
+        format specification mini-language.
+    """
+
+    match = FORMAT_SPEC_PATTERN.fullmatch(format_spec)
+    if not match:
+        raise ValueError(f"Unsupported format specification: {format_spec!r}")
+    return match["prefix"], int(match["width"] or 0), match["suffix"], match["align"]
+
+
+def render_table(
+    rows, columns, file, predicate=None, sample_size=1000, chunk_size=4096
+):
+    """Render the rows as a table to a file
+
+    The width of each column is worked out from the first `sample_size` rows,
+    formatted with the column's format specification. Values wider than that are
+    not cut, they only push the rest of their line to the right. With a
+    `sample_size` of `None`, the widths are worked out from all the rows in a
+    first pass, which keeps nothing in memory but the widths, and the rows are
+    rendered in a second pass. So `rows` must then be iterable more than once,
+    e.g. a tuple or a `range`, not a generator.
+
+    A single format string for a whole row is then compiled from the widths, so
+    the rows are formatted without building each field separately. The rows are
+    formatted and written `chunk_size` at a time, with one `write` call per chunk
+    instead of one `print` per row. Unless the format specification sets the
+    alignment, numbers are right aligned and the rest are left aligned, which is
+    the default of format specifications.
+
+    The format specifications and the rows used for the widths are checked
+    before anything is written.
+
+    Args:
+        rows (`iterable`): The rows of the table.
+        columns (`list`): The `Column`s of the table.
+        file (`io.TextIOBase`): The file to write to.
+        predicate (`function`): Only the rows for which it's true are rendered.
+        sample_size (`int`): The number of rows used to work out the widths.
+        chunk_size (`int`): The number of rows written at once.
+
+    Returns:
+        `int`: The number of rendered rows.
+
+    Raises:
+        `ValueError`: If a format specification isn't supported, or if
+        `sample_size` is `None` and `rows` can only be iterated once.
+    """
+
+    def get_values(row):
+        return tuple(column.get(row) for column in columns)
+
+    specs = [split_format_spec(column.format_spec) for column in columns]
+    # A width in a format specification is the minimum width of its column
+    widths = [
+        max(spec[1], len(column.title)) for column, spec in zip(columns, specs)
+    ]
+    first_values = None
+
+    if sample_size is None:
+        if iter(rows) is rows:
+            raise ValueError("The rows must be iterable twice if sample_size is None")
+        sample = ()
+        sample_rows = rows
+        if predicate is not None:
+            sample_rows = filter(predicate, rows)
+            rows = filter(predicate, rows)
+    else:
+        if predicate is not None:
+            rows = filter(predicate, rows)
+        rows = iter(rows)
+        sample = list(itertools.islice(rows, sample_size))
+        sample_rows = sample
+
+    for values in map(get_values, sample_rows):
+        if first_values is None:
+            first_values = values
+        for position, (value, column) in enumerate(zip(values, columns)):
+            widths[position] = max(
+                widths[position], len(format(value, column.format_spec))
+            )
+
+    alignments = []
+    for position, (_, _, _, alignment) in enumerate(specs):
+        if alignment is None:
+            is_numeric = first_values and isinstance(
+                first_values[position], numbers.Number
+            )
+            alignment = ">" if is_numeric else "<"
+        # `=` only applies to numbers, so the titles are right aligned instead
+        alignments.append(">" if alignment == "=" else alignment)
+
+    header = " | ".join(
+        f"{column.title:{alignment}{width}}"
+        for column, width, alignment in zip(columns, widths, alignments)
+    )
+    ruler = "+".join(
+        "-" * (width + (position not in (0, len(columns) - 1)) + 1)
+        for position, width in enumerate(widths)
+    )
+    file.write(f"{header}\n{ruler}\n")
+
+    # The fields are numbered automatically, so the format of a row repeated
+    # `n` times is the format of `n` rows, given the values of all of them.
+    # Braces can't be escaped inside a format specification, so a spec with a
+    # brace fill character is passed as a nested `{spec_<position>}` field.
+    fields = []
+    nested_specs = {}
+    for position, ((prefix, _, suffix, _), width) in enumerate(zip(specs, widths)):
+        format_spec = f"{prefix}{width}{suffix}"
+        if "{" in format_spec or "}" in format_spec:
+            nested_specs[f"spec_{position}"] = format_spec
+            format_spec = f"{{spec_{position}}}"
+        fields.append(f"{{:{format_spec}}}")
+    row_format = " | ".join(fields) + "\n"
+    full_chunk_format = row_format * chunk_size
+
+    rows = itertools.chain(sample, rows)
+    count = 0
+    while chunk := list(itertools.islice(rows, chunk_size)):
+        if len(chunk) == chunk_size:
+            template = full_chunk_format
+        else:
+            template = row_format * len(chunk)
+        values = itertools.chain.from_iterable(map(get_values, chunk))
+        file.write(template.format(*values, **nested_specs))
+        count += len(chunk)
+    return count
+
+
+def metro_areas_renderer_example():
+    """Metro Areas Renderer Example
+
+    This function renders the same table as `metro_areas_table_example` with
+    `render_table`.
+    """
+
+    columns = [
+        Column("Area", lambda area: area[0], ""),
+        Column("Latitude", lambda area: area[3][0], ".4f"),
+        Column("Longitude", lambda area: area[3][1], ".4f"),
+    ]
+
+    render_table(
+        METRO_AREAS, columns, sys.stdout, predicate=lambda area: area[3][1] <= 0
+    )
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine(latitude_1, longitude_1, latitude_2, longitude_2):
+    """Get the great-circle distance between two points, in kilometres
+
+    Args:
+        latitude_1 (`float`): The latitude of the first point, in degrees.
+        longitude_1 (`float`): The longitude of the first point, in degrees.
+        latitude_2 (`float`): The latitude of the second point, in degrees.
+        longitude_2 (`float`): The longitude of the second point, in degrees.
+
+    Returns:
+        `float`: The distance between the points.
+    """
+    phi_1, phi_2 = math.radians(latitude_1), math.radians(latitude_2)
+    d_phi = phi_2 - phi_1
+    d_lambda = math.radians(longitude_2 - longitude_1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi_1) * math.cos(phi_2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _unit_vector(latitude, longitude):
+    """Get the point on the unit sphere of a latitude and longitude"""
+    phi, lambda_ = math.radians(latitude), math.radians(longitude)
+    return (
+        math.cos(phi) * math.cos(lambda_),
+        math.cos(phi) * math.sin(lambda_),
+        math.sin(phi),
+    )
+
+
+class SpatialIndex:
+    """An index of places for nearest-neighbour and bounding-box queries
+
+    For the nearest places, the places are converted to points on the unit
+    sphere and stored in a k-d tree. The straight-line (chord) distance between
+    two points on the sphere grows with their great-circle distance, so the
+    nearest points in 3D are the nearest places on Earth, without the problems
+    of latitude and longitude near the poles and the antimeridian. The tree is
+    stored implicitly: the points of each subtree are a range of a list, and
+    the root of the subtree is the middle of the range.
+
+    For bounding boxes, the places are also sorted by latitude, so the places
+    within the latitudes of a box are found with `bisect`.
+    """
+
+    def __init__(self, places, location=lambda place: place[3]):
+        """Build the index
+
+        Args:
+            places (`iterable`): The places to index.
+            location (`function`): Gets the `(latitude, longitude)` of a place,
+                by default the last field of the `METRO_AREAS` records.
+        """
+        self._places = list(places)
+        self._locations = list(map(location, self._places))
+
+        vectors = [_unit_vector(*loc) for loc in self._locations]
+        self._tree = list(range(len(self._places)))
+        self._build(vectors, 0, len(self._tree), 0)
+        self._vectors = [vectors[index] for index in self._tree]
+
+        self._by_latitude = sorted(
+            range(len(self._places)), key=lambda index: self._locations[index][0]
+        )
+        self._latitudes = [self._locations[index][0] for index in self._by_latitude]
+
+    def _build(self, vectors, lo, hi, depth):
+        """Arrange `_tree[lo:hi]` as a k-d tree split on the axis of `depth`"""
+        while hi - lo > 1:
+            axis = depth % 3
+            self._tree[lo:hi] = sorted(
+                self._tree[lo:hi], key=lambda index: vectors[index][axis]
+            )
+            mid = (lo + hi) // 2
+            self._build(vectors, lo, mid, depth + 1)
+            lo, depth = mid + 1, depth + 1
+
+    def __len__(self):
+        return len(self._places)
+
+    def nearest(self, latitude, longitude, n=1):
+        """Get the nearest places to a point
+
+        Args:
+            latitude (`float`): The latitude of the point, in degrees.
+            longitude (`float`): The longitude of the point, in degrees.
+            n (`int`): The number of places.
+
+        Returns:
+            `list`: The `(distance, place)` of the `n` nearest places, nearest
+            first, with the distance in kilometres. Empty if `n` isn't positive.
+        """
+        return self._nearest(_unit_vector(latitude, longitude), n)
+
+    def _nearest(self, query, n):
+        if n <= 0:
+            return []
+
+        # A max-heap of the best squared chord distances, as negative numbers
+        best = []
+        vectors = self._vectors
+
+        def search(lo, hi, depth):
+            if lo >= hi:
+                return
+            mid = (lo + hi) // 2
+            x, y, z = vectors[mid]
+            distance = (query[0] - x) ** 2 + (query[1] - y) ** 2 + (query[2] - z) ** 2
+            if len(best) < n:
+                heapq.heappush(best, (-distance, mid))
+            elif distance < -best[0][0]:
+                heapq.heapreplace(best, (-distance, mid))
+
+            axis = depth % 3
+            difference = query[axis] - vectors[mid][axis]
+            near, far = (lo, mid), (mid + 1, hi)
+            if difference > 0:
+                near, far = far, near
+
+            search(*near, depth + 1)
+            # The points on the far side of the splitting plane are at least
+            # `difference` away, so they are only searched if that is closer
+            # than the worst of the best points.
+            if len(best) < n or difference**2 < -best[0][0]:
+                search(*far, depth + 1)
+
+        search(0, len(vectors), 0)
+
+        results = []
+        for negative_distance, position in sorted(best, reverse=True):
+            chord = math.sqrt(-negative_distance)
+            distance = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+            results.append((distance, self._places[self._tree[position]]))
+        return results
+
+    def nearest_many(self, points, n=1, workers=1):
+        """Get the nearest places to many points
+
+        This isn't vectorized: each point is still a separate search of the tree
+        in Python, one after another. It only saves the per-call overhead of
+        `nearest`. With `workers` greater than 1, the points are split among a
+        pool of processes, each of which receives a copy of the index once, and
+        the searches run in parallel.
+
+        Args:
+            points (`list`): The `(latitude, longitude)` of each point.
+            n (`int`): The number of places per point.
+            workers (`int`): The number of worker processes.
+
+        Returns:
+            `list`: The result of `nearest` for each point.
+        """
+        if workers > 1:
+            chunk_size = max(1, len(points) // (workers * 4))
+            chunks = [
+                points[start : start + chunk_size]
+                for start in range(0, len(points), chunk_size)
+            ]
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, initializer=_set_worker_index, initargs=(self,)
+            ) as executor:
+                results = executor.map(
+                    _worker_nearest_many, chunks, itertools.repeat(n)
+                )
+                return list(itertools.chain.from_iterable(results))
+
+        queries = itertools.starmap(_unit_vector, points)
+        return [self._nearest(query, n) for query in queries]
+
+    def within_box(self, min_latitude, min_longitude, max_latitude, max_longitude):
+        """Get the places within a bounding box
+
+        If `min_longitude` is greater than `max_longitude`, the box crosses the
+        antimeridian, e.g. from 170 to -170.
+
+        Args:
+            min_latitude (`float`): The southern edge of the box.
+            min_longitude (`float`): The western edge of the box.
+            max_latitude (`float`): The northern edge of the box.
+            max_longitude (`float`): The eastern edge of the box.
+
+        Returns:
+            `list`: The places in the box, from south to north.
+        """
+        start = bisect.bisect_left(self._latitudes, min_latitude)
+        stop = bisect.bisect_right(self._latitudes, max_latitude)
+
+        if min_longitude <= max_longitude:
+            in_box = lambda longitude: min_longitude <= longitude <= max_longitude
+        else:
+            in_box = lambda longitude: longitude >= min_longitude or (
+                longitude <= max_longitude
+            )
+
+        return [
+            self._places[index]
+            for index in self._by_latitude[start:stop]
+            if in_box(self._locations[index][1])
+        ]
+
+
+_worker_index = None
+
+
+def _set_worker_index(index):
+    global _worker_index
+    _worker_index = index
+
+
+def _worker_nearest_many(points, n):
+    return _worker_index.nearest_many(points, n)
+
+
+def spatial_index_example():
+    """Spatial Index Example
+
+    This function finds the nearest metro areas to a point, and the metro areas
+    within a bounding box.
+    """
+
+    index = SpatialIndex(METRO_AREAS)
+
+    # Philadelphia
+    for distance, (name, *_) in index.nearest(39.952583, -75.165222, n=2):
+        print(f"{name:15} {distance:8.1f} km")
+
+    # The Americas
+    print([name for name, *_ in index.within_box(-60, -170, 70, -30)])
+
+
+def spatial_index_benchmark(places=100_000, queries=200, n=5):
+    """Spatial index benchmark
+
+    Compares the nearest places found by the index with a linear scan that
+    computes the haversine distance to every place.
+
+    Args:
+        places (`int`): The number of random places.
+        queries (`int`): The number of random query points.
+        n (`int`): The number of nearest places per query.
+    """
+
+    def random_point():
+        # Uniform on the sphere, so the places aren't crowded at the poles
+        latitude = math.degrees(math.asin(random.uniform(-1, 1)))
+        return latitude, random.uniform(-180, 180)
+
+    records = [(f"Place {i}", "", 0, random_point()) for i in range(places)]
+    points = [random_point() for _ in range(queries)]
+
+    start = time.perf_counter()
+    index = SpatialIndex(records)
+    elapsed = time.perf_counter() - start
+    print(f"Building the index of {places:,} places: {elapsed:.2f}s")
+
+    def linear_scan(latitude, longitude):
+        distances = (
+            (haversine(latitude, longitude, *record[3]), record) for record in records
+        )
+        return heapq.nsmallest(n, distances, key=lambda result: result[0])
+
+    start = time.perf_counter()
+    expected = [linear_scan(*point) for point in points]
+    print(f"Linear scan: {queries / (time.perf_counter() - start):,.1f} queries/s")
+
+    start = time.perf_counter()
+    found = index.nearest_many(points, n)
+    print(f"Spatial index: {queries / (time.perf_counter() - start):,.1f} queries/s")
+
+    for expected_results, found_results in zip(expected, found):
+        assert [record for _, record in expected_results] == [
+            record for _, record in found_results
+        ]
+
+
 if __name__ == "__main__":
     metro_areas_table_example()
+    # metro_areas_renderer_example()
+    # spatial_index_example()
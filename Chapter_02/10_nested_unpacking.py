@@ -1,5 +1,9 @@
+import contextlib
 import os
+import queue
 import sqlite3
+import tempfile
+import threading
 
 
 def db_results_unpacking_example():
@@ -59,5 +63,220 @@ def db_results_unpacking_example():
     print(f"The name of the user with id 1 is {name}")
 
 
+class ConnectionPool:
+    """A pool of reusable connections to a SQLite database
+
+    Opening a connection opens the database file and reads its schema, so the
+    connections are opened at most `size` times and given back to the pool after
+    use. Each connection uses the write-ahead log (WAL) journal mode, which lets
+    readers work while a transaction is being written.
+    """
+
+    def __init__(self, db_path, size=4):
+        """Initialize the pool
+
+        Args:
+            db_path (`str`): The path of the database file.
+            size (`int`): The maximum number of open connections.
+        """
+        self._db_path = db_path
+        self._size = size
+        self._lock = threading.Lock()
+        self._idle = queue.LifoQueue()
+        # Every open connection, idle or borrowed, so that `close` closes them all
+        self._connections = set()
+        # The number of connections being opened, which count towards `size`
+        self._opening = 0
+        self._closed = False
+
+    def _open(self):
+        # The connections may be used by other threads than the one that opened them
+        conn = sqlite3.connect(self._db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _acquire(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The connection pool is closed")
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            can_open = len(self._connections) + self._opening < self._size
+            if can_open:
+                self._opening += 1
+
+        if not can_open:
+            conn = self._idle.get()
+            if conn is None:
+                # The pool was closed while waiting: wake up the next waiter too
+                self._idle.put(None)
+                raise RuntimeError("The connection pool is closed")
+            return conn
+
+        try:
+            conn = self._open()
+        finally:
+            with self._lock:
+                self._opening -= 1
+        with self._lock:
+            if not self._closed:
+                self._connections.add(conn)
+                return conn
+        conn.close()
+        raise RuntimeError("The connection pool is closed")
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Borrow a connection from the pool
+
+        Waits for a connection to be given back if `size` connections are in use.
+
+        Yields:
+            `sqlite3.Connection`: The connection.
+
+        Raises:
+            `RuntimeError`: If the pool is closed.
+        """
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            with self._lock:
+                # A connection given back after `close` is already closed
+                if not self._closed:
+                    self._idle.put(conn)
+
+    def close(self):
+        """Close all the connections of the pool, including the borrowed ones
+
+        A borrowed connection can't be used anymore once the pool is closed, and
+        it isn't given back to the pool when it's returned. Threads waiting for
+        a connection get a `RuntimeError`.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            connections = list(self._connections)
+            self._connections.clear()
+            while True:
+                try:
+                    self._idle.get_nowait()
+                except queue.Empty:
+                    break
+            # A sentinel for the threads waiting for a connection
+            self._idle.put(None)
+
+        for conn in connections:
+            conn.close()
+
+
+class UserRepository:
+    """Data access to the `users` table"""
+
+    def __init__(self, pool):
+        """Initialize the repository
+
+        Args:
+            pool (`ConnectionPool`): The pool to borrow the connections from.
+        """
+        self._pool = pool
+
+    def create_table(self):
+        """Create the `users` table, if it doesn't exist yet"""
+        with self._pool.connection() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    age INTEGER NOT NULL
+                )
+                """
+            )
+
+    def bulk_insert(self, users):
+        """Insert many users in a single transaction
+
+        `executemany` runs the same prepared statement for every user, and the
+        connection used as a context manager commits once at the end, or rolls
+        back everything if an insert fails.
+
+        Args:
+            users (`iterable`): The `(name, age)` of each user.
+
+        Returns:
+            `int`: The number of inserted users.
+        """
+        with self._pool.connection() as conn, conn:
+            cursor = conn.executemany(
+                "INSERT INTO users (name, age) VALUES (?, ?)", users
+            )
+            return cursor.rowcount
+
+    def get(self, user_id):
+        """Get a user by its primary key
+
+        The query text is always the same and the id is passed as a parameter,
+        so `sqlite3` prepares the statement once and reuses it from its cache.
+
+        Args:
+            user_id (`int`): The id of the user.
+
+        Returns:
+            `tuple`: The `(id, name, age)` of the user, or `None` if there is none.
+        """
+        with self._pool.connection() as conn:
+            return conn.execute(
+                "SELECT id, name, age FROM users WHERE id = ?", (user_id,)
+            ).fetchone()
+
+    def iter_all(self, batch_size=1000):
+        """Iterate over all the users
+
+        The rows are fetched `batch_size` at a time with `fetchmany`, so only a
+        batch of rows is in memory at once, however large the table is. The
+        connection is given back to the pool when the iteration ends.
+
+        Args:
+            batch_size (`int`): The number of rows fetched at once.
+
+        Yields:
+            `tuple`: The `(id, name, age)` of each user.
+        """
+        with self._pool.connection() as conn:
+            cursor = conn.execute("SELECT id, name, age FROM users ORDER BY id")
+            while rows := cursor.fetchmany(batch_size):
+                yield from rows
+
+
+def db_access_layer_example():
+    """Database Access Layer Example
+
+    This function demonstrates the unpacking of rows streamed from the database
+    through a pool of connections.
+    """
+    # A temporary database, so that running the example again doesn't add the
+    # same users to `10_user_db.db`
+    with tempfile.TemporaryDirectory() as directory:
+        pool = ConnectionPool(os.path.join(directory, "users.db"))
+        users = UserRepository(pool)
+
+        users.create_table()
+        users.bulk_insert([("Alice", 25), ("Bob", 30), ("Dave", 40), ("Erin", 45)])
+
+        # `get` returns a single row, which we unpack into its columns
+        _, name, age = users.get(1)
+        print(f"The user with id 1 is {name}, aged {age}")
+
+        for user_id, name, _ in users.iter_all(batch_size=2):
+            print(f"{user_id}: {name}")
+
+        pool.close()
+
+
 if __name__ == "__main__":
     db_results_unpacking_example()
+    # db_access_layer_example()
@@ -12,29 +12,467 @@ In STL, these types are compatible with sequence patterns:
 `list`, `tuple`, `range`, `array.array`, `collections.deque`, `memoryview`
 """
 
+import array
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import itertools
+import json
 import math
+import operator
+import random
+import statistics
+import time
 from pprint import pprint
 import sys
 
 
+def handle_command(command):
+    """Evaluate an arithmetic command like `["add", 1, 2]`.
+
+    Returns `None` if the command doesn't match any of the cases.
+    """
+    match command:
+        case ["add", a, b]:
+            return a + b
+        case ["add", *nums]:
+            return sum(nums)
+        case ["sub", a, b]:
+            return a - b
+        case ["mul", a, b]:
+            return a * b
+        case ["mul", *nums]:
+            return math.prod(nums)
+        case ["div", a, b]:
+            return a / b
+
+
+# Dispatch tables of the commands, keyed by the opcode. The binary forms are the
+# most common, and the variadic forms are the ones matched by `*nums`.
+BINARY_OPERATIONS = {
+    "add": operator.add,
+    "sub": operator.sub,
+    "mul": operator.mul,
+    "div": operator.truediv,
+}
+VARIADIC_OPERATIONS = {
+    "add": sum,
+    "mul": math.prod,
+}
+
+
+def parse_command(line):
+    """Parse a line like `add 1 2` into a command like `["add", 1, 2]`."""
+    operation, *nums = line.split()
+    return [operation, *map(int, nums)]
+
+
+def _evaluate_other(command):
+    """Evaluate a command that isn't a binary command."""
+    match command:
+        case [str(opcode), *nums] if opcode in VARIADIC_OPERATIONS:
+            result = VARIADIC_OPERATIONS[opcode](nums)
+        case _:
+            result = handle_command(command)
+    return math.nan if result is None else result
+
+
+# The largest integer up to which all the integers are exactly floats
+MAX_EXACT_FLOAT_INTEGER = 2**53
+
+
+def _to_float_array(values):
+    """Store the values in an `array("d")` if they are all exactly floats.
+
+    Returns the `values` list itself if one of them isn't, like an integer
+    above `2**53`, which would be rounded, or a complex number.
+    """
+    if any(
+        type(value) is int and abs(value) > MAX_EXACT_FLOAT_INTEGER
+        for value in values
+    ):
+        return values
+    try:
+        return array.array("d", values)
+    except (TypeError, OverflowError):
+        return values
+
+
+def evaluate_commands(commands):
+    """Evaluate a batch of arithmetic commands.
+
+    `handle_command` tries the cases in order for every command. Here the
+    commands are grouped by opcode first. The operation of each group of binary
+    commands is looked up once in the dispatch table, and mapped over the
+    operands of the group. The other commands are looked up in the variadic
+    table, and anything else falls back to `handle_command`, so the results are
+    the same as with `match`.
+
+    With only four cheap operations, the grouping costs about as much as the
+    `match` it saves, so this is not faster than `handle_command` in CPython:
+    see `dispatch_benchmark`. What it adds is the dispatch table, which can be
+    extended, and the typed results.
+
+    Args:
+        `commands` (`list`): The commands to evaluate.
+
+    Returns:
+        `array.array` | `list`: The result of each command in order, and `nan`
+        for the commands that don't match any case. The results are floats in an
+        `array("d")` if they can all be stored exactly as floats, and a `list` of
+        the results as they are otherwise.
+    """
+    groups = collections.defaultdict(list)
+    for index, command in enumerate(commands):
+        opcode = command[0] if len(command) == 3 else None
+        if not isinstance(opcode, str) or opcode not in BINARY_OPERATIONS:
+            opcode = None
+        groups[opcode].append(index)
+
+    results = [math.nan] * len(commands)
+    for opcode, indexes in groups.items():
+        group = list(map(commands.__getitem__, indexes))
+        if opcode is None:
+            values = map(_evaluate_other, group)
+        else:
+            values = map(
+                BINARY_OPERATIONS[opcode],
+                map(operator.itemgetter(1), group),
+                map(operator.itemgetter(2), group),
+            )
+        for index, value in zip(indexes, values):
+            results[index] = value
+
+    return _to_float_array(results)
+
+
+def evaluate_command_stream(lines, batch_size=100_000):
+    """Evaluate a stream of command lines, one batch at a time.
+
+    Args:
+        `lines` (`iterable`): The lines of the commands, e.g. an open log file.
+        `batch_size` (`int`): The number of commands evaluated at once.
+
+    Yields:
+        `array.array` | `list`: The results of each batch, see `evaluate_commands`.
+    """
+    commands = map(parse_command, filter(str.strip, lines))
+    while batch := list(itertools.islice(commands, batch_size)):
+        yield evaluate_commands(batch)
+
+
+def dispatch_benchmark(count=1_000_000):
+    """Compare `match` and table dispatch over random commands.
+
+    Args:
+        `count` (`int`): The number of commands.
+    """
+    operations = ["add", "sub", "mul", "div"]
+    commands = [
+        [random.choice(operations), random.randint(1, 100), random.randint(1, 100)]
+        for _ in range(count)
+    ]
+    commands += [["add", 1, 2, 3], ["mul", 2, 3, 4]] * (count // 100)
+
+    start = time.perf_counter()
+    matched = list(map(handle_command, commands))
+    print(f"match:          {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    dispatched = evaluate_commands(commands)
+    print(f"table dispatch: {time.perf_counter() - start:.3f}s")
+
+    assert matched == list(dispatched)
+
+
+@functools.singledispatch
+def process_entry(entry):
+    """Process a data entry like `handle_data_entry`, dispatching on its type.
+
+    `match` tries the cases of `handle_data_entry` in order for every entry.
+    `functools.singledispatch` picks the handler registered for the type of the
+    entry, and caches the choice per type, so it is a dict lookup after the
+    first entry of each type. The handlers keep the semantics of the cases,
+    e.g. a sequence pattern matches any sequence except `str`, `bytes` and
+    `bytearray`. Any other type is returned as is.
+    """
+    return entry
+
+
+@process_entry.register
+def _(entry: int):
+    return entry * 2
+
+
+@process_entry.register
+def _(entry: str):
+    return "".join(reversed(entry))
+
+
+@process_entry.register(bytes)
+@process_entry.register(bytearray)
+def _(entry):
+    return entry
+
+
+@process_entry.register
+def _(entry: collections.abc.Sequence):
+    # `all` over a `map` of `isinstance` runs the guard without Python code per item
+    if all(map(isinstance, entry, itertools.repeat(int))):
+        return sum(entry)
+    match entry:
+        case (str(text), int(count)):
+            return text * count
+    return entry
+
+
+@process_entry.register
+def _(entry: dict):
+    if all(map(isinstance, entry, itertools.repeat(str))) and all(
+        map(isinstance, entry.values(), itertools.repeat(int))
+    ):
+        return {key: value + 1 for key, value in entry.items()}
+    return entry
+
+
+def process_entry_batch(lines):
+    """Parse and process a batch of JSON lines.
+
+    Args:
+        `lines` (`list`): The JSON lines of the entries.
+
+    Returns:
+        `tuple`: The results, and the `[count, seconds]` spent on each entry type.
+    """
+    stats = collections.defaultdict(lambda: [0, 0.0])
+    results = []
+    for line in lines:
+        entry = json.loads(line)
+        start = time.perf_counter()
+        results.append(process_entry(entry))
+        type_stats = stats[type(entry).__name__]
+        type_stats[0] += 1
+        type_stats[1] += time.perf_counter() - start
+    return results, dict(stats)
+
+
+def stream_data_entries(lines, stats, workers=1, batch_size=1000):
+    """Process a stream of JSON lines lazily.
+
+    The lines are read and processed `batch_size` at a time. With `workers`
+    greater than 1, the batches are processed by a pool of processes, and at
+    most two batches per worker are in flight, so the memory used stays bounded
+    however long the stream is. The results are yielded in the order of the lines.
+
+    Args:
+        `lines` (`iterable`): The JSON lines, e.g. an open file.
+        `stats` (`dict`): Updated with the `[count, seconds]` of each entry type.
+        `workers` (`int`): The number of worker processes.
+        `batch_size` (`int`): The number of lines processed at once.
+
+    Yields:
+        The result of each entry.
+    """
+
+    def merge(results, batch_stats):
+        for type_name, (count, seconds) in batch_stats.items():
+            type_stats = stats.setdefault(type_name, [0, 0.0])
+            type_stats[0] += count
+            type_stats[1] += seconds
+        return results
+
+    lines = filter(str.strip, lines)
+    batches = iter(lambda: list(itertools.islice(lines, batch_size)), [])
+
+    if workers == 1:
+        for batch in batches:
+            yield from merge(*process_entry_batch(batch))
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = collections.deque()
+        for batch in batches:
+            pending.append(executor.submit(process_entry_batch, batch))
+            if len(pending) >= workers * 2:
+                yield from merge(*pending.popleft().result())
+        while pending:
+            yield from merge(*pending.popleft().result())
+
+
+def print_entry_stats(stats):
+    """Print the throughput of each entry type.
+
+    Args:
+        `stats` (`dict`): The `[count, seconds]` of each entry type.
+    """
+    for type_name, (count, seconds) in sorted(stats.items()):
+        rate = count / seconds if seconds else math.inf
+        print(f"{type_name:10} {count:10,} entries {rate:15,.0f} entries/s")
+
+
+def respond_to_command(line):
+    """Evaluate a command line of the calculator protocol.
+
+    Args:
+        `line` (`bytes`): The command, e.g. `b"add 1 2"`.
+
+    Returns:
+        `bytes`: The response line, the result or an `error:` message.
+    """
+    try:
+        result = handle_command(parse_command(line.decode()))
+    except (ValueError, ArithmeticError, UnicodeDecodeError) as error:
+        return f"error: {error}\n".encode()
+    if result is None:
+        return b"error: unknown command\n"
+    return f"{result}\n".encode()
+
+
+# The longest command line that the server accepts, in bytes. A client that
+# never sends a newline would otherwise make the server buffer without limit.
+MAX_COMMAND_LENGTH = 4096
+LINE_TOO_LONG_RESPONSE = b"error: line too long\n"
+
+
+def _respond_to_line(line):
+    if len(line) > MAX_COMMAND_LENGTH:
+        return LINE_TOO_LONG_RESPONSE
+    return respond_to_command(line)
+
+
+async def handle_calculator_client(reader, writer):
+    """Serve a client of the calculator.
+
+    Each request is a command line, like `add 1 2`, and each response is a line
+    with its result. A client may send many requests without waiting for the
+    responses (pipelining). Every read takes all the data that has arrived, the
+    complete lines are evaluated, and their responses are sent with a single
+    write. An incomplete line at the end is kept for the next read.
+
+    A line longer than `MAX_COMMAND_LENGTH` gets an `error:` response. If it
+    isn't complete yet, the rest of it is discarded as it arrives, so at most
+    `MAX_COMMAND_LENGTH` bytes are kept between reads.
+    """
+    pending = b""
+    discarding = False
+    try:
+        while data := await reader.read(65536):
+            *lines, pending = (pending + data).split(b"\n")
+            if discarding:
+                if not lines:
+                    pending = b""
+                    continue
+                # The first line is the end of the line that was too long
+                del lines[0]
+                discarding = False
+
+            responses = list(map(_respond_to_line, filter(bytes.strip, lines)))
+            if len(pending) > MAX_COMMAND_LENGTH:
+                responses.append(LINE_TOO_LONG_RESPONSE)
+                pending = b""
+                discarding = True
+            writer.write(b"".join(responses))
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def start_calculator_server(host="127.0.0.1", port=0, path=None):
+    """Start the calculator server on a TCP port, or on a Unix socket.
+
+    All the clients are served by the event loop of a single thread.
+
+    Args:
+        `host` (`str`): The host of the TCP server.
+        `port` (`int`): The port of the TCP server, any free port if 0.
+        `path` (`str`): The path of the Unix socket, used instead of TCP if given.
+
+    Returns:
+        `asyncio.Server`: The server.
+    """
+    if path is not None:
+        return await asyncio.start_unix_server(handle_calculator_client, path)
+    return await asyncio.start_server(handle_calculator_client, host, port)
+
+
+async def _load_client(connect, requests, pipeline, latencies):
+    """Send `requests` random commands, `pipeline` at a time, and time them."""
+    reader, writer = await connect()
+    operations = ["add", "sub", "mul", "div"]
+    try:
+        for sent in range(0, requests, pipeline):
+            batch = [
+                f"{random.choice(operations)} {random.randint(1, 100)} "
+                f"{random.randint(1, 100)}\n"
+                for _ in range(min(pipeline, requests - sent))
+            ]
+            start = time.perf_counter()
+            writer.write("".join(batch).encode())
+            for _ in batch:
+                await reader.readline()
+                latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run_calculator_load(
+    host="127.0.0.1", port=None, path=None, clients=50, requests=2000, pipeline=16
+):
+    """Generate load on a calculator server and report its throughput.
+
+    Args:
+        `host` (`str`): The host of the TCP server.
+        `port` (`int`): The port of the TCP server.
+        `path` (`str`): The path of the Unix socket, used instead of TCP if given.
+        `clients` (`int`): The number of concurrent clients.
+        `requests` (`int`): The number of requests of each client.
+        `pipeline` (`int`): The number of requests sent before reading responses.
+    """
+    if path is not None:
+        connect = functools.partial(asyncio.open_unix_connection, path)
+    else:
+        connect = functools.partial(asyncio.open_connection, host, port)
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _load_client(connect, requests, pipeline, latencies)
+            for _ in range(clients)
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(f"{len(latencies):,} requests from {clients} clients in {elapsed:.2f}s")
+    print(f"{len(latencies) / elapsed:,.0f} requests/s")
+    print(f"p50 latency: {percentiles[49] * 1000:.2f}ms")
+    print(f"p99 latency: {percentiles[98] * 1000:.2f}ms")
+
+
+def calculator_server_example():
+    """Serve the calculator and put it under load, in the same event loop."""
+
+    async def main():
+        server = await start_calculator_server()
+        host, port = server.sockets[0].getsockname()[:2]
+        async with server:
+            await run_calculator_load(host, port)
+
+    asyncio.run(main())
+
+
 def arithmetic_operations_example():
     """Arithmetic operations using pattern matching."""
 
-    def handle_command(command):
-        match command:
-            case ["add", a, b]:
-                return a + b
-            case ["add", *nums]:
-                return sum(nums)
-            case ["sub", a, b]:
-                return a - b
-            case ["mul", a, b]:
-                return a * b
-            case ["mul", *nums]:
-                return math.prod(nums)
-            case ["div", a, b]:
-                return a / b
-
     operation = sys.argv[1]
     nums = tuple(map(int, sys.argv[2:]))
 
@@ -103,7 +541,16 @@ def manipulating_data_entries_example():
     #  'pythonpython',
     #  {'a': 11, 'b': 21}]
 
+    # The same entries as JSON lines, processed as a stream. JSON has no tuples,
+    # so the tuples become lists, which match the same sequence patterns.
+    lines = map(json.dumps, data_entries)
+    stats = {}
+    pprint(list(stream_data_entries(lines, stats)))
+    print_entry_stats(stats)
+
 
 if __name__ == "__main__":
     # arithmetic_operations_example()
+    # dispatch_benchmark()
+    # calculator_server_example()
     manipulating_data_entries_example()
@@ -4,6 +4,26 @@ Slicing is a powerful feature of Python that allows you to extract a subset of a
 list, tuple, or string. The syntax for slicing is `somelist[start:stop:step]`.
 """
 
+import collections
+import concurrent.futures
+import decimal
+import functools
+import itertools
+import mmap
+import os
+import random
+import tempfile
+import time
+from collections import namedtuple
+
+INVOICE = (
+    "0.....6.................................40........50...55........\n"
+    "1909  Pimoroni PiBrella                 $17.50    3    $52.50\n"
+    "1489  6mm Tactile Switch x20            $4.95     2    $9.90\n"
+    "1510  Panavise Jr. - PV-201             $28.00    1    $28.00\n"
+    "1601  PiTFT Mini Kit 320x240            $34.95    1    $34.95\n"
+)
+
 
 def slicing_example():
     l = [10, 20, 30, 40, 50, 60, 70, 80, 90]
@@ -26,13 +46,7 @@ def slice_object_example():
     a fixed-width record string.
     """
 
-    invoice = (
-        "0.....6.................................40........50...55........\n"
-        "1909  Pimoroni PiBrella                 $17.50    3    $52.50\n"
-        "1489  6mm Tactile Switch x20            $4.95     2    $9.90\n"
-        "1510  Panavise Jr. - PV-201             $28.00    1    $28.00\n"
-        "1601  PiTFT Mini Kit 320x240            $34.95    1    $34.95\n"
-    )
+    invoice = INVOICE
 
     # Split the invoice into line_items
     line_items = tuple(map(str.strip, invoice.split("\n")))[2:-1]
@@ -47,6 +61,316 @@ def slice_object_example():
         print(item[UNIT_PRICE], item[DESCRIPTION])
 
 
+# A field of a fixed-width record: its name, its `start` and `stop` columns like
+# a slice (`stop` of `None` means the end of the line), and the function that
+# converts the stripped bytes of the field to a value.
+Field = namedtuple("Field", ["name", "start", "stop", "convert"])
+
+
+def decode_text(raw):
+    """Convert the bytes of a text field to `str`"""
+    return raw.decode()
+
+
+def parse_price(raw):
+    """Convert the bytes of a price like `$17.50` to `decimal.Decimal`"""
+    return decimal.Decimal(raw.lstrip(b"$").decode())
+
+
+def parse_quantity(raw):
+    """Convert the bytes of a quantity to `int`"""
+    # `int()` accepts bytes of ASCII digits, so there is nothing to decode
+    return int(raw)
+
+
+class FixedWidthLayout:
+    """The layout of the lines of a fixed-width file
+
+    The fields are declared once, and compiled to a plan that maps each field
+    name to its offsets within a line and its converter. The records are read
+    straight from a bytes-like buffer, such as `bytes` or an `mmap`, without
+    splitting it into lines or decoding it first.
+    """
+
+    def __init__(self, *fields):
+        """Initialize the layout
+
+        Args:
+            fields (`Field`): The fields of each line.
+        """
+        self.fields = fields
+        self._plan = {field.name: field[1:] for field in fields}
+
+    def decode(self, buffer, line_start, line_end, name):
+        """Decode a field of a line
+
+        Args:
+            buffer (`bytes` | `mmap.mmap`): The buffer holding the line.
+            line_start (`int`): The offset of the line in the buffer.
+            line_end (`int`): The offset of the end of the line, without the newline.
+            name (`str`): The name of the field.
+
+        Returns:
+            The converted value of the field.
+
+        Raises:
+            `KeyError`: If there is no field with the name.
+        """
+        start, stop, convert = self._plan[name]
+        stop = line_end if stop is None else min(line_start + stop, line_end)
+        return convert(buffer[line_start + start : stop].strip())
+
+    def records(self, buffer, start=0, end=None, skip_lines=0):
+        """Iterate over the records of a buffer
+
+        Only the offsets of each line are found here; a field is sliced from the
+        buffer and converted when it is accessed on the record.
+
+        Args:
+            buffer (`bytes` | `mmap.mmap`): The buffer holding the lines.
+            start (`int`): The offset of the first line.
+            end (`int`): The offset where the lines end, or `None` for the end.
+            skip_lines (`int`): The number of lines to skip, e.g. headers.
+
+        Yields:
+            `FixedWidthRecord`: The record of each non-empty line.
+        """
+        end = len(buffer) if end is None else end
+        line_start = start
+        while line_start < end:
+            newline = buffer.find(b"\n", line_start, end)
+            line_end = end if newline == -1 else newline
+            next_line_start = line_end + 1
+
+            # Lines of files written on Windows end with `\r\n`
+            if line_end > line_start and buffer[line_end - 1] == ord("\r"):
+                line_end -= 1
+
+            if skip_lines:
+                skip_lines -= 1
+            elif line_end > line_start:
+                yield FixedWidthRecord(self, buffer, line_start, line_end)
+
+            line_start = next_line_start
+
+    def read(self, path, skip_lines=0):
+        """Iterate over the records of a file
+
+        The file is mapped into memory with `mmap`, so the operating system pages
+        it in as the records are read, instead of reading it all at once. The
+        records can only be accessed while the iteration is running, because the
+        file is unmapped when it ends.
+
+        Args:
+            path (`str`): The path of the file.
+            skip_lines (`int`): The number of lines to skip, e.g. headers.
+
+        Yields:
+            `FixedWidthRecord`: The record of each non-empty line.
+        """
+        with open(path, "rb") as file:
+            # An empty file can't be mapped
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield from self.records(buffer, skip_lines=skip_lines)
+
+
+class FixedWidthRecord:
+    """A line of a fixed-width file, whose fields are decoded on access"""
+
+    __slots__ = ("_layout", "_buffer", "_start", "_end")
+
+    def __init__(self, layout, buffer, start, end):
+        self._layout = layout
+        self._buffer = buffer
+        self._start = start
+        self._end = end
+
+    def __getattr__(self, name):
+        try:
+            return self._layout.decode(self._buffer, self._start, self._end, name)
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __repr__(self):
+        fields = ", ".join(
+            f"{field.name}={getattr(self, field.name)!r}"
+            for field in self._layout.fields
+        )
+        return f"FixedWidthRecord({fields})"
+
+
+INVOICE_LAYOUT = FixedWidthLayout(
+    Field("sku", 0, 6, decode_text),
+    Field("description", 6, 40, decode_text),
+    Field("unit_price", 40, 50, parse_price),
+    Field("quantity", 50, 55, parse_quantity),
+    Field("item_total", 55, None, parse_price),
+)
+
+
+def fixed_width_layout_example():
+    """Fixed-width layout example
+
+    The slices of `slice_object_example` are declared as the fields of a layout,
+    and the records are read from a memory-mapped invoice file.
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "invoice.txt")
+        with open(path, "w") as file:
+            file.write(INVOICE)
+
+        for item in INVOICE_LAYOUT.read(path, skip_lines=1):
+            print(item.sku, item.unit_price * item.quantity == item.item_total)
+
+
+def split_line_ranges(path, parts):
+    """Split a file into byte ranges that start and end at line boundaries
+
+    The file is first cut into `parts` ranges of equal size, and the end of each
+    range is moved forward to just after the next newline, so that no line is
+    split between two ranges.
+
+    Args:
+        path (`str`): The path of the file.
+        parts (`int`): The number of ranges.
+
+    Returns:
+        `list`: The `(start, end)` of each non-empty range.
+    """
+    size = os.path.getsize(path)
+    ranges = []
+    with open(path, "rb") as file:
+        start = 0
+        for part in range(1, parts + 1):
+            end = size * part // parts
+            if end < size:
+                file.seek(end)
+                file.readline()
+                end = file.tell()
+            if end > start:
+                ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def aggregate_invoice_range(path, start, end, skip_lines=0):
+    """Total the quantity and revenue of each SKU in a byte range of an invoice
+
+    This is the "map" step, which runs in a worker process. Each worker maps the
+    file on its own, and only the totals are sent back to the parent process.
+
+    Args:
+        path (`str`): The path of the invoice file.
+        start (`int`): The offset of the first line of the range.
+        end (`int`): The offset where the range ends.
+        skip_lines (`int`): The number of lines to skip at the start of the range.
+
+    Returns:
+        `dict`: The `[quantity, revenue]` of each SKU.
+    """
+    totals = collections.defaultdict(lambda: [0, decimal.Decimal()])
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for item in INVOICE_LAYOUT.records(buffer, start, end, skip_lines):
+                sku_totals = totals[item.sku]
+                sku_totals[0] += item.quantity
+                sku_totals[1] += item.item_total
+    return dict(totals)
+
+
+def merge_invoice_totals(totals, other):
+    """Add the totals of another range to the totals
+
+    This is the "reduce" step, which combines the results of the workers.
+
+    Args:
+        totals (`dict`): The totals to add to, modified in place.
+        other (`dict`): The totals of another range.
+
+    Returns:
+        `dict`: The merged totals.
+    """
+    for sku, (quantity, revenue) in other.items():
+        if sku in totals:
+            totals[sku][0] += quantity
+            totals[sku][1] += revenue
+        else:
+            totals[sku] = [quantity, revenue]
+    return totals
+
+
+def aggregate_invoice(path, workers=None, skip_lines=0):
+    """Total the quantity and revenue of each SKU of an invoice file in parallel
+
+    The file is split into a few ranges per worker, so that a worker that ends
+    early can pick up another range, and the ranges are aggregated by a pool of
+    processes.
+
+    Args:
+        path (`str`): The path of the invoice file.
+        workers (`int`): The number of worker processes, the number of CPUs if `None`.
+        skip_lines (`int`): The number of header lines at the start of the file.
+
+    Returns:
+        `dict`: The `[quantity, revenue]` of each SKU.
+    """
+    workers = workers or os.cpu_count()
+    if os.path.getsize(path) == 0:
+        return {}
+
+    ranges = split_line_ranges(path, workers * 4)
+    starts, ends = zip(*ranges)
+    # Only the first range contains the header lines
+    skips = itertools.chain([skip_lines], itertools.repeat(0))
+
+    if workers == 1:
+        results = map(
+            aggregate_invoice_range, itertools.repeat(path), starts, ends, skips
+        )
+        return functools.reduce(merge_invoice_totals, results, {})
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            aggregate_invoice_range, itertools.repeat(path), starts, ends, skips
+        )
+        return functools.reduce(merge_invoice_totals, results, {})
+
+
+def invoice_aggregation_benchmark(lines=2_000_000):
+    """Invoice aggregation benchmark
+
+    Writes an invoice of random items and measures the time taken to aggregate
+    it with 1, 2, 4, ... workers, up to the number of CPUs.
+
+    Args:
+        lines (`int`): The number of items of the invoice.
+    """
+    items = INVOICE.splitlines()[1:]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "invoice.txt")
+        with open(path, "w") as file:
+            file.write(INVOICE.splitlines(keepends=True)[0])
+            for written in range(0, lines, 10_000):
+                chunk = random.choices(items, k=min(10_000, lines - written))
+                file.write("\n".join(chunk) + "\n")
+
+        print(f"Aggregating {lines:,} items ({os.path.getsize(path) / 2**20:.1f} MiB)")
+        baseline = None
+        workers = 1
+        while workers <= os.cpu_count():
+            start = time.perf_counter()
+            aggregate_invoice(path, workers, skip_lines=1)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:3} workers: {elapsed:.2f}s ({baseline / elapsed:.1f}x)")
+            workers *= 2
+
+
 if __name__ == "__main__":
     slicing_example()
     # slice_object_example()
+    # fixed_width_layout_example()
+    # invoice_aggregation_benchmark()
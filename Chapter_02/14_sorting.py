@@ -1,3 +1,17 @@
+import collections
+import concurrent.futures
+import gc
+import heapq
+import itertools
+import operator
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+
+
 def sorting_with_strings():
     """String sorting
 
@@ -42,6 +56,443 @@ def sorting_with_dicts():
     print(sorted(posts, key=rating_key, reverse=True))
 
 
+def _write_run(items, directory, batch_size=10_000):
+    """Spill a sorted run to a temporary file, as pickled batches of items"""
+    file = tempfile.NamedTemporaryFile(dir=directory, delete=False)
+    with file:
+        for start in range(0, len(items), batch_size):
+            pickle.dump(items[start : start + batch_size], file)
+    return file.name
+
+
+def _read_run(path):
+    """Read the items of a run back, one batch in memory at a time"""
+    with open(path, "rb") as file:
+        while True:
+            try:
+                yield from pickle.load(file)
+            except EOFError:
+                return
+
+
+def external_sort(lines, key=None, reverse=False, memory_limit=64 * 2**20):
+    """Sort lines that don't fit in memory
+
+    The lines are read in chunks of about `memory_limit` bytes. Each chunk is
+    sorted in memory and spilled to a temporary file (a "run"), and the runs are
+    then merged with `heapq.merge`, which only holds the next line of each run.
+
+    With a `key`, the key of each line is computed once, when its chunk is read.
+    The runs store `(key, line)` pairs, so the merge compares the stored keys
+    instead of calling `key` again. Both `sorted` and `heapq.merge` are stable,
+    and the runs are merged in the order they were read, so the whole sort is
+    stable, also with `reverse=True`, like `sorted`.
+
+    Args:
+        lines (`iterable`): The lines to sort, e.g. an open file.
+        key (`function`): The sort key of a line, like `str.casefold` or `len`.
+        reverse (`bool`): Whether to sort in descending order.
+        memory_limit (`int`): The approximate size in bytes of a chunk.
+
+    Yields:
+        `str`: The sorted lines.
+    """
+    lines = iter(lines)
+    get_item_key = operator.itemgetter(0) if key else None
+
+    def read_chunk():
+        """Return the next sorted chunk and whether it's the last one"""
+        chunk = []
+        size = 0
+        for line in lines:
+            if key:
+                item = (key(line), line)
+                size += sys.getsizeof(item[0])
+            else:
+                item = line
+            chunk.append(item)
+            size += sys.getsizeof(line)
+            if size >= memory_limit:
+                break
+        chunk.sort(key=get_item_key, reverse=reverse)
+        return chunk, size < memory_limit
+
+    def values(items):
+        return map(operator.itemgetter(1), items) if key else items
+
+    chunk, is_last = read_chunk()
+    # Everything fits in a single chunk, so there is nothing to spill
+    if is_last:
+        yield from values(chunk)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        runs = [_write_run(chunk, directory)]
+        while not is_last:
+            # Release the previous chunk before reading the next one
+            chunk = None
+            chunk, is_last = read_chunk()
+            if chunk:
+                runs.append(_write_run(chunk, directory))
+        chunk = None
+
+        merged = heapq.merge(
+            *(_read_run(path) for path in runs), key=get_item_key, reverse=reverse
+        )
+        yield from values(merged)
+
+
+def external_sort_file(input_path, output_path, **kwargs):
+    """Sort the lines of a file into another file with `external_sort`
+
+    Args:
+        input_path (`str`): The path of the file to sort.
+        output_path (`str`): The path of the sorted file.
+        kwargs: The `key`, `reverse` and `memory_limit` of `external_sort`.
+    """
+    with open(input_path) as input_file, open(output_path, "w") as output_file:
+        lines = (line.rstrip("\n") for line in input_file)
+        for line in external_sort(lines, **kwargs):
+            output_file.write(line)
+            output_file.write("\n")
+
+
+def external_sort_example():
+    """Sort a list of fruits with a tiny memory limit, so that it spills runs"""
+    fruits = ["banana", "Apple", "mango", "kiwi", "orange", "grape"] * 3
+    print(list(external_sort(fruits, key=str.casefold, memory_limit=200)))
+    print(list(external_sort(fruits, key=len, reverse=True, memory_limit=200)))
+
+
+SortKey = collections.namedtuple("SortKey", "field reverse")
+
+
+def compile_sort_keys(keys):
+    """Normalize multi-level sort keys
+
+    Args:
+        keys (`iterable`): The keys, from the most to the least significant. A
+            key is a field name, sorted in ascending order, or a `(field, reverse)`
+            pair.
+
+    Returns:
+        `list`: The `SortKey` of each level.
+    """
+    return [
+        SortKey(key, False) if isinstance(key, str) else SortKey(*key)
+        for key in keys
+    ]
+
+
+def multi_key_sort(records, keys):
+    """Sort records in place on several keys, each ascending or descending
+
+    Sorting on a tuple of fields can't mix directions, and negating a field only
+    works for numbers. Since Timsort is stable, sorting on each key in turn, from
+    the least to the most significant one, leaves the records in the order of
+    the secondary keys wherever the primary keys are equal. Each pass uses an
+    `operator.itemgetter`, so the keys are extracted in C instead of by a lambda.
+
+    Args:
+        records (`list`): The records, like dicts.
+        keys (`iterable`): The keys, as accepted by `compile_sort_keys`.
+
+    Returns:
+        `list`: The sorted records.
+    """
+    for field, reverse in reversed(compile_sort_keys(keys)):
+        records.sort(key=operator.itemgetter(field), reverse=reverse)
+    return records
+
+
+def _descending_key(column):
+    """Get a function that maps the values of a column to keys in reverse order
+
+    Numbers are simply negated. Other values, like strings, are replaced by
+    their negated rank among the unique values of the column, which are sorted
+    once, so that the keys are plain integers compared in C.
+
+    Args:
+        column (`iterable`): The values of the column.
+
+    Returns:
+        `function`: The function that maps a value to its key.
+    """
+    values = set(column)
+    if all(isinstance(value, (int, float)) for value in values):
+        return operator.neg
+    ranks = dict(zip(sorted(values), itertools.count(0, -1)))
+    return ranks.__getitem__
+
+
+# The records and key functions of a worker of `parallel_sort`. They are set by
+# the initializer of the pool, so with the default "fork" start method on Linux
+# the workers inherit them from the parent instead of receiving a pickled copy.
+_partition_records = None
+_partition_keys = None
+
+
+def _init_sort_worker(records, keys):
+    global _partition_records, _partition_keys
+    _partition_records = records
+    _partition_keys = keys
+    # Building millions of tuples triggers the cyclic garbage collector over and
+    # over, and each collection walks all the records. Tuples of keys can't form
+    # cycles, so the short-lived workers don't need it.
+    gc.disable()
+
+
+def _sort_partition(start, stop):
+    """Sort a partition of the records of a worker
+
+    Returns:
+        `list`: The `(*keys, index)` tuple of each record of the partition, in
+        ascending order. The index of the record makes the sort stable.
+    """
+    partition = _partition_records[start:stop]
+    columns = []
+    for field, key in _partition_keys:
+        column = map(operator.itemgetter(field), partition)
+        columns.append(list(map(key, column) if key else column))
+    run = list(zip(*columns, range(start, stop)))
+    run.sort()
+    return run
+
+
+def parallel_sort(records, keys, workers=None, min_partition_size=100_000):
+    """Sort records on several keys with a pool of processes
+
+    Every key is first turned into an ascending one, see `_descending_key`, so
+    that a record can be compared by a plain tuple of its keys. Each worker
+    builds the `(*keys, index)` tuples of a partition of the records and sorts
+    them in C, and the sorted runs are merged with `heapq.merge`. Ties are
+    broken by the index of the records, so the sort is stable, like `sorted`.
+
+    Args:
+        records (`list`): The records, like dicts.
+        keys (`iterable`): The keys, as accepted by `compile_sort_keys`.
+        workers (`int`): The number of worker processes, the number of CPUs if `None`.
+        min_partition_size (`int`): The minimum number of records of a partition.
+
+    Returns:
+        `list`: A new list with the sorted records.
+    """
+    keys = compile_sort_keys(keys)
+    workers = min(workers or os.cpu_count(), len(records) // min_partition_size)
+    if workers <= 1:
+        return multi_key_sort(list(records), keys)
+
+    key_functions = [
+        (
+            field,
+            _descending_key(map(operator.itemgetter(field), records))
+            if reverse
+            else None,
+        )
+        for field, reverse in keys
+    ]
+    size = -(-len(records) // workers)
+    starts = range(0, len(records), size)
+    stops = [min(start + size, len(records)) for start in starts]
+    # Unpickling the runs also creates millions of tuples, see `_init_sort_worker`
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_sort_worker,
+            initargs=(records, key_functions),
+        ) as executor:
+            runs = list(executor.map(_sort_partition, starts, stops))
+
+        indexes = map(operator.itemgetter(-1), heapq.merge(*runs))
+        return list(map(records.__getitem__, indexes))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def parallel_sort_benchmark(sizes=(1_000_000, 10_000_000, 50_000_000), workers=None):
+    """Parallel sort benchmark
+
+    Sorts random posts by descending views and ascending title with `sorted`
+    on a tuple key, with `multi_key_sort`, and with `parallel_sort` with 2, 4,
+    ... workers, up to `workers`. Holding 50 million posts takes tens of GiB of
+    memory.
+
+    The parent process still unpickles the runs, merges them and gathers the
+    records, so the speedup is bounded by that serial part, and it only shows
+    with several CPUs: with a single CPU the workers take turns.
+
+    Args:
+        sizes (`iterable`): The numbers of posts.
+        workers (`int`): The maximum number of worker processes, the number of
+            CPUs if `None`.
+    """
+    keys = [("views", True), "title"]
+    workers = workers or os.cpu_count()
+    for size in sizes:
+        posts = [
+            {"title": f"Post {i}", "views": random.randrange(size // 10 or 1)}
+            for i in range(size)
+        ]
+        print(f"Sorting {size:,} posts ({os.cpu_count()} CPUs)")
+
+        start = time.perf_counter()
+        expected = sorted(posts, key=lambda post: (-post["views"], post["title"]))
+        baseline = time.perf_counter() - start
+        print(f"  sorted:                   {baseline:.2f}s")
+
+        start = time.perf_counter()
+        multi_key_sort(list(posts), keys)
+        elapsed = time.perf_counter() - start
+        print(f"  multi_key_sort:           {elapsed:.2f}s ({baseline / elapsed:.1f}x)")
+
+        pool_size = 2
+        while pool_size <= max(workers, 2):
+            start = time.perf_counter()
+            result = parallel_sort(posts, keys, pool_size, min_partition_size=1)
+            elapsed = time.perf_counter() - start
+            print(
+                f"  parallel_sort, {pool_size:2} workers: "
+                f"{elapsed:.2f}s ({baseline / elapsed:.1f}x)"
+            )
+            assert result == expected
+            pool_size *= 2
+        del posts, expected, result
+
+
+class TopKIndex:
+    """Scores of keys, from which the top k keys are found without sorting
+
+    The scores are kept in a heap, as `(-score, key)` so that the highest score
+    is at the top. Changing a score pushes a new entry in O(log n), and leaves
+    the old entry in the heap. Old entries are recognised by their score not
+    matching the current one, and are dropped when they reach the top. The heap
+    is rebuilt when it holds more old entries than current ones.
+    """
+
+    def __init__(self):
+        self._scores = {}
+        self._heap = []
+
+    def __len__(self):
+        return len(self._scores)
+
+    def set(self, key, score):
+        """Set the score of a key, in O(log n)"""
+        self._scores[key] = score
+        heapq.heappush(self._heap, (-score, key))
+        if len(self._heap) > 2 * len(self._scores) + 64:
+            self._heap = [(-score, key) for key, score in self._scores.items()]
+            heapq.heapify(self._heap)
+
+    def remove(self, key):
+        """Remove a key, its entries are dropped later"""
+        del self._scores[key]
+
+    def top(self, k):
+        """Get the `k` keys with the highest scores, in O(k log n)
+
+        The current entries are popped from the heap and pushed back afterwards.
+        Keys with equal scores are ordered by key.
+
+        Returns:
+            `list`: The `(key, score)` of the top keys, highest first.
+        """
+        top = []
+        seen = set()
+        while self._heap and len(top) < k:
+            negative_score, key = heapq.heappop(self._heap)
+            # A key whose score changed back to an old value may have two current
+            # entries, only the first one is kept.
+            if self._scores.get(key) == -negative_score and key not in seen:
+                seen.add(key)
+                top.append((key, -negative_score))
+        for key, score in top:
+            heapq.heappush(self._heap, (-score, key))
+        return top
+
+
+class PostRanking:
+    """Rankings of posts by views and by average rating, updated incrementally
+
+    Sorting every post again for each change is O(n log n). Here the running
+    sum and count of the ratings of each post are kept, so the average rating
+    is updated in O(1) instead of summing all the ratings again, and both
+    rankings are `TopKIndex`es, updated in O(log n) per change.
+    """
+
+    def __init__(self, posts=()):
+        """Initialize the rankings
+
+        Args:
+            posts (`iterable`): Posts like the ones of `sorting_with_dicts`.
+        """
+        self._stats = {}
+        self._by_views = TopKIndex()
+        self._by_rating = TopKIndex()
+        for post in posts:
+            self.add_post(post["title"], post["views"], post["ratings"])
+
+    def add_post(self, title, views=0, ratings=()):
+        """Add a post, or replace it if it exists"""
+        self._stats[title] = [views, sum(ratings), len(ratings)]
+        self._by_views.set(title, views)
+        self._by_rating.set(title, self.average_rating(title))
+
+    def remove_post(self, title):
+        """Remove a post from the rankings"""
+        del self._stats[title]
+        self._by_views.remove(title)
+        self._by_rating.remove(title)
+
+    def add_views(self, title, count=1):
+        """Add views to a post"""
+        stats = self._stats[title]
+        stats[0] += count
+        self._by_views.set(title, stats[0])
+
+    def add_rating(self, title, rating):
+        """Add a rating to a post"""
+        stats = self._stats[title]
+        stats[1] += rating
+        stats[2] += 1
+        self._by_rating.set(title, self.average_rating(title))
+
+    def average_rating(self, title):
+        """Get the average rating of a post, 0 if it has no ratings"""
+        _, rating_sum, rating_count = self._stats[title]
+        return rating_sum / rating_count if rating_count else 0
+
+    def top_by_views(self, k=50):
+        """Get the `(title, views)` of the `k` most viewed posts"""
+        return self._by_views.top(k)
+
+    def top_by_rating(self, k=50):
+        """Get the `(title, average rating)` of the `k` best rated posts"""
+        return self._by_rating.top(k)
+
+
+def ranking_with_dicts():
+    posts = [
+        {"title": "Post 1", "views": 10, "ratings": [5, 4.4, 3.9, 4.1, 4.7]},
+        {"title": "Post 2", "views": 15, "ratings": [4.9, 4.2, 4.8, 4.5, 4.6]},
+        {"title": "Post 3", "views": 25, "ratings": [4.1, 4.2, 4.3, 4.4, 4.5]},
+        {"title": "Post 4", "views": 20, "ratings": [4.6, 4.7, 4.8, 4.9, 5.0]},
+    ]
+    ranking = PostRanking(posts)
+    print("Top 2 by views:", ranking.top_by_views(2))
+
+    ranking.add_views("Post 1", 20)
+    ranking.add_rating("Post 4", 1.0)
+    print("Top 2 by views:", ranking.top_by_views(2))
+    print("Top 2 by average rating:", ranking.top_by_rating(2))
+
+
 if __name__ == "__main__":
     # sorting_with_strings()
     sorting_with_dicts()
+    # ranking_with_dicts()
+    # external_sort_example()
+    # parallel_sort_benchmark()